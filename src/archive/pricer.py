@@ -1,5 +1,7 @@
 import QuantLib as ql
+from ..batch import extract_option_columns
 from ..enums import OptionType, OptionColumns
+from ..market_state import set_evaluation_date
 from .stochastic_processes import StochasticProcess
 import numpy as np
 from tqdm import tqdm
@@ -24,26 +26,30 @@ Problems to solve
 
 class Pricer:
     def price_all(self, df, use_tqdm = False):
+        """
+        Price every row of df. Columns are extracted once as arrays instead of walking iterrows().
+        """
+        arrays = extract_option_columns(df, columns={
+            'underlying': OptionColumns.UNDERLYING,
+            'strike': OptionColumns.STRIKE,
+            'sigma': OptionColumns.SIGMA,
+            'rf_rate': OptionColumns.RF_RATE,
+            'days_to_maturity': OptionColumns.DAYS_TO_MATURITY,
+            'div': OptionColumns.DIVIDEND_RATE,
+        })
         prices = np.zeros(df.shape[0])
 
-        iterator = df.iterrows()
+        iterator = range(df.shape[0])
 
         if use_tqdm:
             iterator = tqdm(iterator, total=df.shape[0])
 
-        for i, row in iterator:
-            strike = row[OptionColumns.STRIKE]
-            sigma = row[OptionColumns.SIGMA]
-            div = row[OptionColumns.DIVIDEND_RATE]
-            days_to_maturity = row[OptionColumns.DAYS_TO_MATURITY]
-            rf_rate = row[OptionColumns.RF_RATE]
-            underlying = row[OptionColumns.UNDERLYING]
-
-            prices[i] = self.price(underlying=underlying, 
-                                   strike=strike, sigma=sigma, 
-                                   days_to_maturity=days_to_maturity, 
-                                   rf_rate=rf_rate, 
-                                   div=div)
+        for i in iterator:
+            prices[i] = self.price(underlying=arrays['underlying'][i], 
+                                   strike=arrays['strike'][i], sigma=arrays['sigma'][i], 
+                                   maturity=arrays['days_to_maturity'][i], 
+                                   rf_rate=arrays['rf_rate'][i], 
+                                   div=arrays['div'][i])
         return prices
     
 class MCEuropeanPricer(Pricer):
@@ -73,7 +79,7 @@ class MCEuropeanPricer(Pricer):
         maturity_date = ql.Date(self.calculation_date.serialNumber() + int(maturity))
         day_count = ql.Actual365Fixed()
         calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
-        ql.Settings.instance().evaluationDate = self.calculation_date
+        set_evaluation_date(self.calculation_date)
 
         bsm_process = StochasticProcess.bsm_process(
             underlying=underlying, 
@@ -114,7 +120,7 @@ class BinomialEuropeanPricer(Pricer):
         maturity_date = ql.Date(self.calculation_date.serialNumber() + int(maturity))
         day_count = ql.Actual365Fixed()
         calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
-        ql.Settings.instance().evaluationDate = self.calculation_date
+        set_evaluation_date(self.calculation_date)
 
         bsm_process = StochasticProcess.bsm_process(
             underlying=underlying, 
@@ -161,7 +167,7 @@ class AnalyticEuropeanPricer(Pricer):
         maturity_date = ql.Date(self.calculation_date.serialNumber() + int(maturity))
         day_count = ql.Actual365Fixed()
         calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
-        ql.Settings.instance().evaluationDate = self.calculation_date
+        set_evaluation_date(self.calculation_date)
 
         bsm_process = StochasticProcess.bsm_process(
             underlying=underlying, 
@@ -230,7 +236,7 @@ class FdBlackScholesVanillaPricer(Pricer):
         maturity_date = ql.Date(self.calculation_date.serialNumber() + int(maturity))
         day_count = ql.Actual365Fixed()
         calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
-        ql.Settings.instance().evaluationDate = self.calculation_date
+        set_evaluation_date(self.calculation_date)
 
         bsm_process = StochasticProcess.bsm_process(underlying, rf_rate, div, sigma, self.calculation_date, day_count, calendar)
 
@@ -0,0 +1,132 @@
+import time
+from enum import Enum
+
+import numpy as np
+import QuantLib as ql
+from tqdm import tqdm
+
+from .config import (STRIKE_COL, UNDERLYING_COL, RF_RATE_COL, DIV_COL, SIGMA_COL,
+                     DAYS_TO_MATURITY_COL, OPTION_TYPE_COL)
+from .models.black_scholes import is_call
+
+# Pricer argument name -> column name
+OPTION_COLUMNS = {
+    'underlying': UNDERLYING_COL,
+    'strike': STRIKE_COL,
+    'sigma': SIGMA_COL,
+    'rf_rate': RF_RATE_COL,
+    'days_to_maturity': DAYS_TO_MATURITY_COL,
+    'div': DIV_COL,
+}
+OPTIONAL_COLUMNS = {
+    'option_type': OPTION_TYPE_COL,
+}
+
+
+def _column_names(data):
+    if hasattr(data, 'columns'):
+        return set(data.columns)
+    if isinstance(data, np.ndarray):
+        if data.dtype.names is None:
+            raise TypeError("NumPy input must be a structured array with named fields")
+        return set(data.dtype.names)
+    return set(data.keys())
+
+
+def extract_option_columns(data, columns = None):
+    """
+    Validate and extract pricing inputs as whole column arrays, once.
+
+    Args:
+        data (pd.DataFrame, np.ndarray or dict): Option chain as a DataFrame, a structured
+            array, or a mapping of column name to array
+        columns (dict): Overrides of pricer argument name -> column name (str or OptionColumns),
+            defaults to the names in config.py
+
+    Returns:
+        dict: Pricer argument name -> contiguous float64 array, except 'option_type' which is normalized
+            to ql.Option codes so the batch and per-row price() paths accept the same flags
+    """
+    mapping = {**OPTION_COLUMNS, **OPTIONAL_COLUMNS, **(columns or {})}
+    mapping = {arg: col.value if isinstance(col, Enum) else col for arg, col in mapping.items()}
+    available = _column_names(data)
+
+    missing = [col for arg, col in mapping.items() if arg not in OPTIONAL_COLUMNS and col not in available]
+    if missing:
+        raise KeyError(f"Missing option columns: {missing}")
+
+    arrays = {}
+    for arg, col in mapping.items():
+        if col not in available:
+            continue
+        values = np.asarray(data[col])
+        if arg == 'option_type':
+            arrays[arg] = np.where(is_call(values), ql.Option.Call, ql.Option.Put)
+        else:
+            arrays[arg] = np.ascontiguousarray(values, dtype=np.float64)
+
+    lengths = {arg: len(values) for arg, values in arrays.items()}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(f"Option columns have different lengths: {lengths}")
+    return arrays
+
+
+def price_columns(pricer, calculation_date, arrays, use_tqdm = False):
+    """
+    Price whole column arrays, using the pricer's price_batch when it has one
+    and falling back to a per-row price() loop otherwise.
+
+    Returns:
+        tuple: (prices as np.ndarray, stats dict with rows, seconds, rows_per_second and mode)
+    """
+    rows = len(next(iter(arrays.values()))) if arrays else 0
+    start = time.perf_counter()
+
+    if hasattr(pricer, 'price_batch'):
+        mode = 'batch'
+        prices = np.asarray(pricer.price_batch(**arrays), dtype=np.float64)
+    else:
+        mode = 'row'
+        prices = np.zeros(rows)
+        iterator = range(rows)
+        if use_tqdm:
+            iterator = tqdm(iterator, total=rows)
+        for i in iterator:
+            prices[i] = pricer.price(calculation_date, **{arg: values[i] for arg, values in arrays.items()})
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else float('inf'),
+        'mode': mode,
+    }
+    return prices, stats
+
+
+def derive_seeds(seed, n):
+    """
+    Derive one seed per option from a base seed with a vectorized SplitMix64 hash of (seed, index),
+    so option i gets the same seed however a chain is sharded across workers.
+
+    Returns:
+        np.ndarray: n non-zero uint32 seeds (QuantLib treats a zero seed as "seed from the clock")
+    """
+    with np.errstate(over='ignore'):
+        z = np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15) + np.arange(1, n + 1, dtype=np.uint64) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    seeds = (z & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    seeds[seeds == 0] = 1
+    return seeds
+
+
+def chunk_bounds(rows, workers, chunk_size = None, chunks_per_worker = 4):
+    """
+    Split rows into contiguous (start, stop) chunks. By default each worker gets a few chunks,
+    enough to balance uneven option costs while keeping the number of IPC round trips small.
+    """
+    if chunk_size is None:
+        chunk_size = max(1, -(-rows // (workers * chunks_per_worker)))
+    return [(start, min(start + chunk_size, rows)) for start in range(0, rows, chunk_size)]
@@ -0,0 +1,208 @@
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .batch import extract_option_columns, price_columns
+from .models.black_scholes import is_call
+from .pricer import Pricer
+
+KEY_FIELDS = ('underlying', 'strike', 'sigma', 'rf_rate', 'days_to_maturity', 'div', 'option_type')
+
+# Approximate bookkeeping cost of one OrderedDict entry (links, boxed float value and expiry)
+_ENTRY_OVERHEAD = 200
+
+
+class PriceCache:
+    """
+    LRU price cache with optional TTL and memory cap.
+
+    Args:
+        max_entries (int): Maximum number of cached prices, least recently used are evicted first
+        ttl (float): Seconds an entry stays valid, None to keep entries until evicted
+        max_bytes (int): Approximate memory cap for keys and values, None for no cap
+        clock (callable): Time source, defaults to time.monotonic
+    """
+    def __init__(self, max_entries = 100_000, ttl = None, max_bytes = None, clock = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _entry_bytes(key):
+        return sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) + _ENTRY_OVERHEAD
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires = entry
+        if expires is not None and expires <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_many(self, keys):
+        """
+        Look up many keys at once.
+
+        Returns:
+            tuple: (values as np.ndarray, NaN where missing; boolean array of hits)
+        """
+        found = [self.get(key) for key in keys]
+        hits = np.fromiter((value is not None for value in found), dtype=bool, count=len(found))
+        values = np.fromiter((np.nan if value is None else value for value in found), dtype=np.float64, count=len(found))
+        return values, hits
+
+    def put(self, key, value):
+        if key in self._entries:
+            self._remove(key)
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        self._entries[key] = (value, expires)
+        self.bytes += self._entry_bytes(key)
+        self._evict()
+
+    def put_many(self, keys, values):
+        for key, value in zip(keys, np.asarray(values, dtype=np.float64).tolist()):
+            self.put(key, value)
+
+    def _remove(self, key):
+        del self._entries[key]
+        self.bytes -= self._entry_bytes(key)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            key, _ = self._entries.popitem(last=False)
+            self.bytes -= self._entry_bytes(key)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class CachedPricer(Pricer):
+    """
+    Memoizing wrapper around any pricer in src/pricer.py.
+
+    Keys are the pricing inputs, quantized per field, plus the wrapped pricer's engine parameters
+    (steps, paths, grids, seed...), so changing an engine setting never returns stale prices.
+    Batch calls build the keys from the column arrays and deduplicate them with one lexsort, look up
+    each distinct key once (hits and misses count distinct keys), then price only the misses in one
+    call to the wrapped pricer's price_batch (or its per-row price() when it has none).
+
+    Args:
+        pricer (Pricer): Pricer to wrap
+        cache (PriceCache): Cache to use, defaults to a new PriceCache()
+        quantization (dict): Field name -> step, e.g. {'underlying': 1.0, 'sigma': 1e-4}.
+            Inputs are rounded to the nearest step before lookup, unlisted fields must match exactly
+    """
+    def __init__(self, pricer, cache = None, quantization = None):
+        self.pricer = pricer
+        self.cache = cache if cache is not None else PriceCache()
+        self.quantization = quantization or {}
+        self.option_type = pricer.option_type
+        unknown = set(self.quantization) - set(KEY_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot quantize {sorted(unknown)}, expected fields from {KEY_FIELDS}")
+        print(f"Created {CachedPricer.__name__} around {type(pricer).__name__}")
+
+    def _engine_key(self):
+        params = tuple(sorted((name, value) for name, value in vars(self.pricer).items()
+                              if name != 'option_type' and isinstance(value, (int, float, str, bool, type(None)))))
+        return (type(self.pricer).__name__, params)
+
+    def _keys(self, arrays):
+        """
+        Distinct cache keys of a batch, built from the column arrays.
+
+        Returns:
+            tuple: (keys of the distinct rows, index of each distinct row's first occurrence,
+                index into keys of every row)
+        """
+        columns = []
+        for field in KEY_FIELDS:
+            values = arrays[field]
+            if field == 'option_type':
+                values = np.where(is_call(values), 1.0, -1.0)
+            values = np.asarray(values, dtype=np.float64)
+            step = self.quantization.get(field)
+            if step is not None:
+                values = np.rint(values / step)
+            # + 0.0 turns -0.0 into 0.0, which would otherwise be a different key byte-wise
+            columns.append(values + 0.0)
+        matrix = np.column_stack(np.broadcast_arrays(*columns))
+
+        # Distinct rows from one lexsort: runs of equal rows in sorted order share a key
+        order = np.lexsort(matrix.T[::-1])
+        ordered = matrix[order]
+        starts = np.r_[True, (ordered[1:] != ordered[:-1]).any(axis=1)] if len(order) else np.zeros(0, dtype=bool)
+        inverse = np.empty(len(order), dtype=np.int64)
+        inverse[order] = np.cumsum(starts) - 1
+        first = order[starts]
+        # Each distinct row becomes one bytes value of its fields
+        unique = np.ascontiguousarray(matrix[first])
+        rows = unique.view(np.dtype((np.void, unique.itemsize * unique.shape[1]))).ravel().tolist()
+        engine_key = self._engine_key()
+        return [(engine_key, row) for row in rows], first, inverse
+
+    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
+        return float(self.price_batch(underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type,
+                                      calculation_date=calculation_date)[0])
+
+    def price_batch(self, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None, calculation_date = None):
+        """
+        Cached prices for arrays named after the columns in config.py.
+        calculation_date is required when the wrapped pricer has no price_batch.
+        Duplicate rows are looked up and priced once.
+        """
+        if calculation_date is None and not hasattr(self.pricer, 'price_batch'):
+            raise ValueError(f"{type(self.pricer).__name__} prices row by row and needs a calculation_date")
+        if option_type is None:
+            option_type = self.option_type
+        arrays = dict(zip(KEY_FIELDS, np.broadcast_arrays(*(np.atleast_1d(v) for v in
+                      (underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type)))))
+        keys, first, inverse = self._keys(arrays)
+
+        values, hits = self.cache.get_many(keys)
+        missing = np.flatnonzero(~hits)
+        if missing.size:
+            rows = first[missing]
+            missed = {field: column[rows] for field, column in arrays.items()}
+            computed, _ = price_columns(self.pricer, calculation_date, missed)
+            values[missing] = computed
+            self.cache.put_many([keys[i] for i in missing], computed)
+        return values[inverse]
+
+    def price_all(self, calculation_date, data, columns = None, use_tqdm = False):
+        arrays = extract_option_columns(data, columns)
+        return price_columns(self, calculation_date, {**arrays, 'calculation_date': calculation_date})
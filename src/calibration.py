@@ -0,0 +1,205 @@
+import time
+
+import numpy as np
+import QuantLib as ql
+from scipy.optimize import least_squares
+
+from .models.black_scholes import DAYS_PER_YEAR, bsm_greeks
+from .models.fourier import bates_cf, bates_cumulants, cos_chain_plan, cos_plan_price, heston_cf, heston_cumulants
+from .models.implied_volatility import implied_volatility
+from .pricer import BatesPricer, HestonPricer
+
+# Model name -> (parameter names, characteristic function, cumulants, pricer), parameters in process order
+MODELS = {
+    'heston': (('v0', 'kappa', 'theta', 'sigma', 'rho'), heston_cf, heston_cumulants, HestonPricer),
+    'bates': (('v0', 'kappa', 'theta', 'sigma', 'rho', 'lambda_param', 'nu', 'delta'), bates_cf, bates_cumulants, BatesPricer),
+}
+DEFAULT_BOUNDS = {
+    'v0': (1e-4, 4.0),
+    'kappa': (1e-2, 20.0),
+    'theta': (1e-4, 4.0),
+    'sigma': (1e-2, 10.0),
+    'rho': (-0.99, 0.99),
+    'lambda_param': (0.0, 20.0),
+    'nu': (-1.0, 1.0),
+    'delta': (1e-3, 1.0),
+}
+OBJECTIVES = ('price', 'vega', 'iv')
+
+
+class Calibrator:
+    """
+    Least squares calibration of heston_process / bates_process parameters to an option chain.
+
+    The chain's expiry groups, COS nodes and phase matrices are planned once per fit (see
+    models.fourier.cos_chain_plan), so each objective evaluation is one characteristic function
+    call and one matrix product per expiry. Jacobians are forward differences with every bumped
+    parameter set priced in the same batched call. Each fit starts from the previous solution
+    (warm start) and its convergence statistics are printed and kept in history.
+
+    Args:
+        model (str): 'heston' or 'bates'
+        objective (str): 'vega' for price errors divided by the market vega (first-order IV errors),
+            'iv' for exact implied volatility errors, 'price' for raw price errors
+        bounds (dict): Overrides of parameter name -> (lower, upper), defaults to DEFAULT_BOUNDS
+        n_terms (int): COS terms per expiry
+        truncation (float): COS interval half-width in standard deviations
+        max_nfev (int): Maximum number of objective evaluations per fit
+        tol (float): ftol, xtol and gtol of scipy.optimize.least_squares
+        verbose (bool): Print the statistics of every fit
+    """
+    def __init__(self, model = 'heston', objective = 'vega', bounds = None, n_terms = 256, truncation = 12.0,
+                 max_nfev = 200, tol = 1e-10, verbose = True):
+        if model not in MODELS:
+            raise ValueError(f"Unknown model {model}, expected one of {tuple(MODELS)}")
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective {objective}, expected one of {OBJECTIVES}")
+        self.model = model
+        self.objective = objective
+        self.param_names, self.cf, self.cumulants, self.pricer_class = MODELS[model]
+        bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+        self.lower = np.array([bounds[name][0] for name in self.param_names], dtype=np.float64)
+        self.upper = np.array([bounds[name][1] for name in self.param_names], dtype=np.float64)
+        self.n_terms = n_terms
+        self.truncation = truncation
+        self.max_nfev = max_nfev
+        self.tol = tol
+        self.verbose = verbose
+        self.params = None
+        self.history = []
+
+    def initial_guess(self, atm_variance):
+        guess = {'v0': atm_variance, 'kappa': 2.0, 'theta': atm_variance, 'sigma': 1.0, 'rho': -0.3,
+                 'lambda_param': 0.5, 'nu': 0.0, 'delta': 0.1}
+        return np.array([guess[name] for name in self.param_names])
+
+    def _plan(self, x, S, K, r, T, q, option_type):
+        return cos_chain_plan(lambda t: self.cumulants(t, *x), S, K, r, T, q, option_type,
+                              n_terms=self.n_terms, truncation=self.truncation, cache_phases=True)
+
+    def _covers(self, plan, x, S, K, r, T, q, option_type):
+        needed = cos_chain_plan(lambda t: self.cumulants(t, *x), S, K, r, T, q, option_type,
+                                n_terms=self.n_terms, truncation=self.truncation)['intervals']
+        return bool(np.all(needed[:, 0] >= plan['intervals'][:, 0]) and np.all(needed[:, 1] <= plan['intervals'][:, 1]))
+
+    def _prices(self, plan, X):
+        """
+        Model prices for the (sets, parameters) matrix X, shape (sets, options).
+        """
+        columns = [X[:, i, None, None] for i in range(X.shape[1])]
+        return cos_plan_price(plan, self.cf(plan['u'], plan['t'][:, None], *columns))
+
+    def fit(self, underlying, strike, rf_rate, days_to_maturity, div, option_type, market_price,
+            initial = None, price_in_underlying = False):
+        """
+        Calibrate to a chain given as arrays named after the columns in config.py.
+        For Deribit snapshots pass each option's underlying_price (the expiry's forward) as underlying with
+        zero rf_rate and div, and mark prices with price_in_underlying=True. days_to_maturity may be
+        fractional (e.g. hours to a Deribit expiry) and is used exactly, not truncated to whole days.
+
+        Args:
+            market_price (array): Market prices, in USD unless price_in_underlying
+            initial (dict): Starting parameters, defaults to the previous fit's solution,
+                else a guess from the at-the-money implied volatility
+            price_in_underlying (bool): Prices are quoted in units of the underlying
+
+        Returns:
+            dict: 'params' (name -> value) and convergence statistics
+        """
+        start = time.perf_counter()
+        S, K, r, days, q, price = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in
+                                                        (underlying, strike, rf_rate, days_to_maturity, div, market_price)))
+        S, K, r, days, q, price = (v.ravel() for v in (S, K, r, days, q, price))
+        call = np.broadcast_to(option_type, S.shape).ravel()
+        if price_in_underlying:
+            price = price * S
+        # Exact maturities: truncating to whole days (year_fraction) would fit sub-day Deribit expiries
+        # at T = 0 and a 1.9-day option as 1 day
+        T = days / DAYS_PER_YEAR
+        forward = S * np.exp((r - q) * T)
+
+        # Quotes without an implied volatility (expired, below intrinsic...) cannot be fitted
+        market_iv = implied_volatility(price, forward, K, T, call, rf_rate=r)
+        used = np.isfinite(market_iv) & (market_iv > 0.0)
+        if not used.any():
+            raise ValueError("No option in the chain has a valid implied volatility")
+        S, K, r, T, q, price, call, forward, market_iv = (v[used] for v in (S, K, r, T, q, price, call, forward, market_iv))
+        vega = bsm_greeks(S, K, market_iv, r, T, q, call, greeks=('vega',))['vega']
+        vega = np.maximum(vega, 0.01 * S * np.exp(-q * T) * np.sqrt(T / (2.0 * np.pi)))
+
+        warm = initial is None and self.params is not None
+        if initial is not None:
+            x0 = np.array([initial[name] for name in self.param_names], dtype=np.float64)
+        elif warm:
+            x0 = self.params.copy()
+        else:
+            atm = np.abs(np.log(forward / K)) <= 0.1
+            x0 = self.initial_guess(float(np.median(market_iv[atm] if atm.any() else market_iv)) ** 2)
+        margin = 1e-8 * (self.upper - self.lower)
+        x0 = np.clip(x0, self.lower + margin, self.upper - margin)
+
+        def residuals(X, plan):
+            model = self._prices(plan, X)
+            if self.objective == 'price':
+                return model - price
+            weighted = (model - price) / vega
+            if self.objective == 'vega':
+                return weighted
+            iv = implied_volatility(model, forward, K, T, call, rf_rate=r)
+            return np.where(np.isfinite(iv), iv - market_iv, weighted)
+
+        def jacobian(x, plan):
+            steps = 1e-6 * np.maximum(np.abs(x), 1e-2)
+            # Bump inwards at the upper bound so every parameter set stays feasible
+            steps = np.where(x + steps > self.upper, -steps, steps)
+            X = np.vstack((x, x + np.diag(steps)))
+            values = residuals(X, plan)
+            return ((values[1:] - values[0]) / steps[:, None]).T
+
+        plan = self._plan(x0, S, K, r, T, q, call)
+        evaluations, jacobians, refits = 0, 0, 0
+        while True:
+            solution = least_squares(lambda x: residuals(x[None], plan)[0], x0, jac=lambda x: jacobian(x, plan),
+                                     bounds=(self.lower, self.upper), x_scale='jac', method='trf',
+                                     ftol=self.tol, xtol=self.tol, gtol=self.tol, max_nfev=self.max_nfev)
+            evaluations += solution.nfev
+            jacobians += solution.njev
+            # The plan was sized for the starting parameters, replan once if the solution needs wider intervals
+            if refits or self._covers(plan, solution.x, S, K, r, T, q, call):
+                break
+            refits += 1
+            x0 = solution.x
+            plan = self._plan(x0, S, K, r, T, q, call)
+
+        self.params = solution.x.copy()
+        errors = residuals(solution.x[None], plan)[0]
+        result = {
+            'params': dict(zip(self.param_names, solution.x.tolist())),
+            'options': int(used.sum()),
+            'rmse': float(np.sqrt(np.mean(errors ** 2))),
+            'max_error': float(np.abs(errors).max()),
+            'evaluations': evaluations,
+            'jacobians': jacobians,
+            'status': solution.status,
+            'success': bool(solution.success),
+            'message': solution.message,
+            'warm_start': warm,
+            'seconds': time.perf_counter() - start,
+        }
+        self.history.append(result)
+        if self.verbose:
+            print(f"Calibrated {self.model} to {result['options']} options in {result['seconds'] * 1000:.1f} ms: "
+                  f"{self.objective} rmse {result['rmse']:.3g}, max {result['max_error']:.3g}, "
+                  f"{evaluations} evaluations, {jacobians} jacobians, "
+                  f"{'warm' if warm else 'cold'} start, status {solution.status}")
+        return result
+
+    def pricer(self, option_type = ql.Option.Call):
+        """
+        Pricer with the calibrated parameters, pricing exact maturities with the fit's COS settings
+        so it reproduces the fitted prices.
+        """
+        if self.params is None:
+            raise ValueError("Calibrator has not been fitted yet")
+        return self.pricer_class(*self.params, option_type = option_type, n_terms = self.n_terms,
+                                 truncation = self.truncation, exact_maturity = True)
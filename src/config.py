@@ -4,4 +4,5 @@ RF_RATE_COL = 'rf_rate'
 DIV_COL = 'div'
 SIGMA_COL = 'sigma'
 DAYS_TO_MATURITY_COL = 'days_to_maturity'
+OPTION_TYPE_COL = 'option_type'
 
@@ -0,0 +1,357 @@
+import io
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
+
+# Columns of public/get_instruments kept in deribit_instruments, after the surrogate key and symbol
+INSTRUMENT_COLUMNS = [
+    'deribit_instruments_id', 'symbol_id', 'instrument_id', 'instrument_name', 'instrument_type', 'option_type',
+    'kind', 'strike', 'contract_size', 'base_currency', 'quote_currency', 'counter_currency', 'price_index',
+    'is_active', 'settlement_period', 'settlement_currency', 'expiration_timestamp', 'rfq', 'style',
+]
+MARKET_DATA_COLUMNS = [
+    'deribit_instruments_id', 'timestamp', 'timestamp_to_expiry', 'underlying_price', 'underlying_index',
+    'mark_price', 'bid_price', 'ask_price', 'mid_price', 'low', 'last', 'high', 'open_interest', 'interest_rate',
+    'volume', 'volume_usd', 'volume_notional', 'price_change', 'estimated_delivery_price', 'current_funding',
+    'funding_8h', 'forward_price', 'log_simple_moneyness', 'implied_volatility', 'delta', 'gamma', 'theta', 'vega',
+    'expected_move',
+]
+
+# DDL for a local test database, matching the tables the archived pipeline wrote to
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deribit_instruments (
+    deribit_instruments_id BIGINT PRIMARY KEY,
+    symbol_id INTEGER NOT NULL,
+    instrument_id BIGINT NOT NULL,
+    instrument_name TEXT NOT NULL,
+    instrument_type TEXT,
+    option_type TEXT,
+    kind TEXT,
+    strike DOUBLE PRECISION,
+    contract_size DOUBLE PRECISION,
+    base_currency TEXT,
+    quote_currency TEXT,
+    counter_currency TEXT,
+    price_index TEXT,
+    is_active BOOLEAN,
+    settlement_period TEXT,
+    settlement_currency TEXT,
+    expiration_timestamp BIGINT,
+    rfq BOOLEAN,
+    style TEXT,
+    UNIQUE (symbol_id, instrument_id)
+);
+CREATE TABLE IF NOT EXISTS deribit_market_data (
+    deribit_instruments_id BIGINT NOT NULL REFERENCES deribit_instruments,
+    timestamp BIGINT NOT NULL,
+    timestamp_to_expiry BIGINT,
+    underlying_price DOUBLE PRECISION,
+    underlying_index TEXT,
+    mark_price DOUBLE PRECISION,
+    bid_price DOUBLE PRECISION,
+    ask_price DOUBLE PRECISION,
+    mid_price DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    last DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    open_interest DOUBLE PRECISION,
+    interest_rate DOUBLE PRECISION,
+    volume DOUBLE PRECISION,
+    volume_usd DOUBLE PRECISION,
+    volume_notional DOUBLE PRECISION,
+    price_change DOUBLE PRECISION,
+    estimated_delivery_price DOUBLE PRECISION,
+    current_funding DOUBLE PRECISION,
+    funding_8h DOUBLE PRECISION,
+    forward_price DOUBLE PRECISION,
+    log_simple_moneyness DOUBLE PRECISION,
+    implied_volatility DOUBLE PRECISION,
+    delta DOUBLE PRECISION,
+    gamma DOUBLE PRECISION,
+    theta DOUBLE PRECISION,
+    vega DOUBLE PRECISION,
+    expected_move DOUBLE PRECISION
+);
+"""
+
+
+class Database:
+    """
+    PostgreSQL access through a thread-safe connection pool, with COPY-based bulk ingestion.
+
+    Args:
+        dsn (str): libpq connection string, e.g. 'postgresql://postgres@localhost:5432/deribit_test'
+        minconn (int): Connections opened up front
+        maxconn (int): Maximum pooled connections
+        **connect_kwargs: Passed to psycopg2.connect (host, dbname, user, port, ...)
+    """
+    def __init__(self, dsn = None, minconn = 1, maxconn = 4, **connect_kwargs):
+        self.pool = ThreadedConnectionPool(minconn, maxconn, dsn, **connect_kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if not self.pool.closed:
+            self.pool.closeall()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a pooled connection for one transaction: committed on success, rolled back on error.
+        """
+        connection = self.pool.getconn()
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self.pool.putconn(connection)
+
+    def execute(self, query, params = None):
+        with self.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(query, params)
+
+    def fetchall(self, query, params = None):
+        with self.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def create_tables(self):
+        self.execute(SCHEMA)
+
+    @staticmethod
+    def copy(cursor, df, table, columns = None):
+        """
+        Stream a DataFrame into a table with COPY ... FROM STDIN on an open cursor.
+        Missing values (NaN, None) are written as NULL.
+
+        Returns:
+            int: Rows copied
+        """
+        columns = list(columns if columns is not None else df.columns)
+        frame = df.reindex(columns=columns)
+        for name in frame.columns[(frame.dtypes == np.float64).to_numpy()]:
+            values = frame[name].to_numpy()
+            # Integer columns holding NULLs arrive as floats, and COPY rejects '1.0' for BIGINT
+            if np.array_equal(values, np.round(values), equal_nan=True) and np.all(np.abs(values[~np.isnan(values)]) < 2 ** 53):
+                frame[name] = frame[name].astype('Int64')
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, na_rep='')
+        buffer.seek(0)
+        statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '')").format(
+            sql.Identifier(table), sql.SQL(', ').join(map(sql.Identifier, columns)))
+        cursor.copy_expert(statement, buffer)
+        return len(df)
+
+    def copy_dataframe(self, df, table, columns = None):
+        """
+        Bulk insert a DataFrame in one COPY, replacing row-by-row INSERTs.
+
+        Args:
+            df (pd.DataFrame): Rows to insert
+            table (str): Target table
+            columns (list): Table columns, taken from df (missing ones as NULL); defaults to df.columns
+
+        Returns:
+            int: Rows inserted
+        """
+        if df.empty:
+            return 0
+        with self.connection() as connection, connection.cursor() as cursor:
+            return self.copy(cursor, df, table, columns)
+
+
+class InstrumentIdCache:
+    """
+    In-memory map of a symbol's Deribit instruments to their deribit_instruments_id surrogate keys.
+
+    The table is read once; afterwards refresh() only fetches rows with ids above the largest one seen,
+    and add() inserts unseen instruments in a single transaction that locks the table against concurrent
+    writers, so new ids stay unique without re-reading every instrument on each cycle.
+
+    Args:
+        database (Database): Pooled database
+        symbol_id (int): Symbol whose instruments are cached
+    """
+    def __init__(self, database, symbol_id):
+        self.database = database
+        self.symbol_id = symbol_id
+        self.max_id = 0
+        self.ids = {}
+        self.frame = pd.DataFrame(columns=INSTRUMENT_COLUMNS)
+        self.refresh()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, instrument_id):
+        return instrument_id in self.ids
+
+    def _fetch_new(self, cursor):
+        cursor.execute(sql.SQL("SELECT {} FROM deribit_instruments WHERE deribit_instruments_id > %s ORDER BY 1").format(
+            sql.SQL(', ').join(map(sql.Identifier, INSTRUMENT_COLUMNS))), (self.max_id,))
+        rows = pd.DataFrame(cursor.fetchall(), columns=INSTRUMENT_COLUMNS)
+        if not rows.empty:
+            self.max_id = max(self.max_id, int(rows['deribit_instruments_id'].max()))
+            self._merge(rows[rows['symbol_id'] == self.symbol_id])
+
+    def _merge(self, rows):
+        if rows.empty:
+            return
+        self.ids.update(zip(rows['instrument_id'].tolist(), rows['deribit_instruments_id'].tolist()))
+        self.frame = rows if self.frame.empty else pd.concat([self.frame, rows], ignore_index=True)
+
+    def refresh(self):
+        """
+        Pick up instruments inserted since the last refresh, e.g. by another process.
+        """
+        with self.database.connection() as connection, connection.cursor() as cursor:
+            self._fetch_new(cursor)
+        return self
+
+    def add(self, instruments):
+        """
+        Insert the instruments not in the cache.
+
+        Args:
+            instruments: public/get_instruments result (list of dicts) or a DataFrame of it
+
+        Returns:
+            pd.DataFrame: Inserted rows with their new deribit_instruments_id
+        """
+        df = pd.DataFrame(instruments)
+        if df.empty:
+            return df.reindex(columns=INSTRUMENT_COLUMNS)
+        with self.database.connection() as connection, connection.cursor() as cursor:
+            # Held until commit: other writers wait, then see our ids through their own refresh
+            cursor.execute("LOCK TABLE deribit_instruments IN SHARE ROW EXCLUSIVE MODE")
+            self._fetch_new(cursor)
+            new = df[~df['instrument_id'].isin(self.ids.keys())].drop_duplicates('instrument_id')
+            new = new.reindex(columns=INSTRUMENT_COLUMNS)
+            if new.empty:
+                return new
+            new['deribit_instruments_id'] = np.arange(self.max_id + 1, self.max_id + 1 + len(new))
+            new['symbol_id'] = self.symbol_id
+            new['style'] = 'european'
+            Database.copy(cursor, new, 'deribit_instruments', INSTRUMENT_COLUMNS)
+        self.max_id += len(new)
+        self._merge(new.reset_index(drop=True))
+        return new
+
+    def lookup(self, instrument_ids):
+        """
+        deribit_instruments_id of each instrument_id, NaN for unknown instruments.
+        """
+        return pd.Series(instrument_ids).map(self.ids).to_numpy()
+
+    def active(self, timestamp):
+        """
+        Cached instruments expiring after timestamp (epoch milliseconds), replacing a query per update cycle.
+        """
+        return self.frame[self.frame['expiration_timestamp'] > timestamp]
+
+
+class BufferedWriter:
+    """
+    Background thread that batches DataFrames per table and COPYs them into the database, so a fetch loop
+    only pays for a queue put.
+
+    Pending frames of a table are concatenated and written once flush_rows rows are buffered or
+    flush_interval seconds have passed. Failed batches are kept in errors with their exception instead of
+    stopping the thread.
+
+    Args:
+        database (Database): Pooled database
+        flush_rows (int): Rows buffered per table before a write
+        flush_interval (float): Maximum seconds a row waits before being written
+        max_queue (int): Maximum queued frames before write() blocks, 0 for unbounded
+    """
+    def __init__(self, database, flush_rows = 10_000, flush_interval = 1.0, max_queue = 0):
+        self.database = database
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.batches_written = 0
+        self.errors = []
+        self._queue = queue.Queue(max_queue)
+        self._buffers = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='BufferedWriter', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, df, table, columns = None):
+        """
+        Queue a DataFrame for insertion into table, see Database.copy_dataframe().
+        """
+        if self._stop.is_set():
+            raise RuntimeError("BufferedWriter is closed")
+        if not df.empty:
+            self._queue.put((table, columns, df))
+
+    def flush(self):
+        """
+        Block until everything queued so far is written.
+        """
+        self._queue.put(None)
+        self._queue.join()
+
+    def close(self):
+        if not self._stop.is_set():
+            self.flush()
+            self._stop.set()
+            self._thread.join()
+
+    def _write(self, key):
+        table, columns = key
+        frames, _ = self._buffers.pop(key)
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        try:
+            self.database.copy_dataframe(df, table, list(columns) if columns is not None else None)
+            self.rows_written += len(df)
+            self.batches_written += 1
+        except Exception as e:
+            self.errors.append((table, df, e))
+
+    def _run(self):
+        while not self._stop.is_set():
+            deadline = min((first for _, first in self._buffers.values()), default=None)
+            timeout = self.flush_interval if deadline is None else max(deadline + self.flush_interval - time.monotonic(), 0.0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+            if item is None:
+                # flush() marker: write everything buffered before acknowledging it
+                for key in list(self._buffers):
+                    self._write(key)
+                self._queue.task_done()
+                continue
+            if item:
+                table, columns, df = item
+                key = (table, tuple(columns) if columns is not None else None)
+                frames, first = self._buffers.setdefault(key, ([], time.monotonic()))
+                frames.append(df)
+                if sum(map(len, frames)) >= self.flush_rows:
+                    self._write(key)
+                self._queue.task_done()
+            now = time.monotonic()
+            for key in [key for key, (_, first) in self._buffers.items() if now - first >= self.flush_interval]:
+                self._write(key)
@@ -1,8 +1,195 @@
 # https://github.com/nostoz/deribit_volatility_download_and_visualize
+import asyncio
+import itertools
+import json
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+HTTP_URL = "https://www.deribit.com/api/v2"
+WS_URL = "wss://www.deribit.com/ws/api/v2"
+
+
+class DeribitError(Exception):
+    """
+    JSON-RPC error returned by Deribit.
+    """
+    def __init__(self, method, code, message, data = None):
+        super().__init__(f"{method} failed with error {code}: {message}")
+        self.method = method
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def _query_value(value):
+    if isinstance(value, bool):
+        return str(value).lower()
+    return value
+
 
 class DeribitHTTP:
-    def __init__(self):
-        self.url = ""
-    
-    def send_request(endpoint):
+    """
+    Blocking client for Deribit's public HTTP API, for one-off requests.
+    For many requests use DeribitWebSocket, which keeps them in flight concurrently.
+    """
+    def __init__(self, url = HTTP_URL, timeout = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send_request(self, endpoint, params = None):
+        """
+        Args:
+            endpoint (str): Method such as 'public/get_book_summary_by_currency'
+            params (dict): Query parameters
+
+        Returns:
+            The 'result' field of the response
+        """
+        query = urlencode({key: _query_value(value) for key, value in (params or {}).items()})
+        try:
+            with urlopen(f"{self.url}/{endpoint}?{query}", timeout=self.timeout) as response:
+                payload = json.load(response)
+        except HTTPError as e:
+            # Deribit answers errors with a JSON-RPC body and a 4xx status, proxies (502 pages...) do not
+            try:
+                payload = json.load(e)
+            except ValueError:
+                raise e from None
+            if not isinstance(payload, dict) or 'error' not in payload:
+                raise
+        if 'error' in payload:
+            error = payload['error']
+            raise DeribitError(endpoint, error.get('code'), error.get('message'), error.get('data'))
+        return payload['result']
+
+
+class DeribitWebSocket:
+    """
+    Asyncio JSON-RPC client over one persistent websocket connection.
+
+    Every call gets a fresh id and a future; a single reader task resolves futures as responses arrive,
+    in any order, so any number of requests can be in flight at once. Connects lazily on the first call,
+    and can be pointed at a local mock server through url.
+
+    Args:
+        url (str): Websocket endpoint
+        timeout (float): Seconds to wait for each response
+    """
+    def __init__(self, url = WS_URL, timeout = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self.connection = None
+        self._reader = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def connected(self):
+        return self.connection is not None and self._reader is not None and not self._reader.done()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self.connected:
+                return
+            import websockets
+            self.connection = await websockets.connect(self.url, max_size=None)
+            self._reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self.connection is not None:
+            await self.connection.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+        self.connection = None
+        self._reader = None
+
+    async def _read(self):
+        error = ConnectionError(f"Connection to {self.url} closed")
+        try:
+            async for message in self.connection:
+                payload = json.loads(message)
+                method, future = self._pending.pop(payload.get('id'), (None, None))
+                if future is None or future.done():
+                    # Subscription notifications and responses to timed out requests
+                    continue
+                if 'error' in payload:
+                    error_payload = payload['error']
+                    future.set_exception(DeribitError(method, error_payload.get('code'),
+                                                      error_payload.get('message'), error_payload.get('data')))
+                else:
+                    future.set_result(payload.get('result'))
+        except Exception as e:
+            error = ConnectionError(f"Connection to {self.url} lost: {e}")
+        finally:
+            for _, future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def call(self, method, params = None):
+        """
+        Send one JSON-RPC request and wait for its response.
+
+        Args:
+            method (str): Method such as 'public/get_instruments'
+            params (dict): Method parameters
+
+        Returns:
+            The 'result' field of the response
+        """
+        if not self.connected:
+            await self.connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (method, future)
+        try:
+            await self.connection.send(json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method,
+                                                   'params': params or {}}))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def call_many(self, calls, return_exceptions = True):
+        """
+        Send many requests concurrently over the connection.
+
+        Args:
+            calls (list): (method, params) pairs
+            return_exceptions (bool): Return failures in place of results instead of raising the first one
+
+        Returns:
+            list: Results in the order of calls
+        """
+        return await asyncio.gather(*(self.call(method, params) for method, params in calls),
+                                    return_exceptions=return_exceptions)
+
+    async def get_instruments(self, currency, kind = 'option', expired = False):
+        return await self.call('public/get_instruments', {'currency': currency, 'kind': kind, 'expired': expired})
+
+    async def get_book_summary_by_currency(self, currency, kind = 'option'):
+        """
+        Book summaries of every instrument of a currency and kind in a single request.
+        """
+        return await self.call('public/get_book_summary_by_currency', {'currency': currency, 'kind': kind})
+
+    async def get_book_summary_by_instruments(self, instrument_names):
+        """
+        Book summaries of specific instruments, requested concurrently. Prefer get_book_summary_by_currency
+        when most of a currency's instruments are needed.
 
+        Returns:
+            dict: Instrument name -> summary dict, or the exception raised for that instrument
+        """
+        results = await self.call_many([('public/get_book_summary_by_instrument', {'instrument_name': name})
+                                        for name in instrument_names])
+        return {name: result[0] if isinstance(result, list) and result else result
+                for name, result in zip(instrument_names, results)}
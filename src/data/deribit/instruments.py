@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+from ...models.black_scholes import DAYS_PER_YEAR
+
+# Deribit options expire at 08:00 UTC on the date in their name
+EXPIRY_HOUR_MS = 8 * 60 * 60 * 1000
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def parse_instrument_names(names):
+    """
+    Split Deribit option names such as 'BTC-27DEC24-50000-C' or 'XRP_USDC-27DEC24-0d625-P'
+    ('d' standing for the decimal point) into their fields, parsing each distinct expiry only once.
+
+    Returns:
+        dict: Arrays 'underlying' (str), 'expiration_timestamp' (int64, epoch milliseconds),
+            'strike' (float64) and 'is_call' (bool)
+    """
+    parts = pd.Series(names, dtype=object).str.split('-', expand=True)
+    if parts.shape[1] != 4 or parts.isna().any(axis=None) or not parts[3].isin(['C', 'P']).all():
+        bad = [name for name in names if len(name.split('-')) != 4 or name.rsplit('-', 1)[-1] not in ('C', 'P')]
+        raise ValueError(f"Not Deribit option instrument names: {bad[:5]}")
+    expiry_labels, expiry_codes = np.unique(parts[1].to_numpy(dtype=str), return_inverse=True)
+    expiries = pd.to_datetime(pd.Series(expiry_labels).str.title(), format='%d%b%y', utc=True)
+    expiry_ms = (expiries.to_numpy(dtype='datetime64[ms]').astype(np.int64) + EXPIRY_HOUR_MS)
+    return {
+        'underlying': parts[0].to_numpy(dtype=str),
+        'expiration_timestamp': expiry_ms[expiry_codes],
+        'strike': parts[2].str.replace('d', '.', regex=False).astype(np.float64).to_numpy(),
+        'is_call': (parts[3] == 'C').to_numpy(),
+    }
+
+
+class InstrumentRegistry:
+    """
+    Struct-of-arrays registry of Deribit options, parsed from their names once.
+
+    Each instrument gets a stable integer index; its fields live in parallel arrays (underlying and expiry
+    as small integer codes into self.underlyings and self.expiries, strike, call flag, expiry timestamp),
+    so pricing and IV code can gather inputs with index arrays instead of string operations per snapshot.
+    Name -> index lookups are dict lookups, and the groupings by expiry and strike are built once per
+    set of instruments.
+
+    Args:
+        names (iterable): Instrument names to register
+    """
+    def __init__(self, names = ()):
+        self.names = np.empty(0, dtype=object)
+        self.underlying_code = np.empty(0, dtype=np.int16)
+        self.expiry_code = np.empty(0, dtype=np.int16)
+        self.strike = np.empty(0, dtype=np.float64)
+        self.is_call = np.empty(0, dtype=bool)
+        self.expiration_timestamp = np.empty(0, dtype=np.int64)
+        self.underlyings = []
+        self.expiries = np.empty(0, dtype=np.int64)
+        self._index = {}
+        self._groups = None
+        self.add(names)
+
+    @classmethod
+    def from_instruments(cls, instruments):
+        """
+        Registry of a public/get_instruments result (list of dicts or DataFrame), options only.
+        """
+        df = pd.DataFrame(instruments)
+        if 'kind' in df:
+            df = df[df['kind'] == 'option']
+        return cls(df['instrument_name'].tolist())
+
+    def __len__(self):
+        return self.names.size
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __getitem__(self, index):
+        return {
+            'instrument_name': self.names[index],
+            'underlying': self.underlyings[self.underlying_code[index]],
+            'expiration_timestamp': int(self.expiration_timestamp[index]),
+            'strike': float(self.strike[index]),
+            'option_type': 'call' if self.is_call[index] else 'put',
+        }
+
+    @staticmethod
+    def _codes(values, table):
+        """
+        Integer codes of values in table (a list extended in place), keeping existing codes stable.
+        """
+        lookup = {value: code for code, value in enumerate(table)}
+        for value in dict.fromkeys(values.tolist()):
+            if value not in lookup:
+                lookup[value] = len(table)
+                table.append(value)
+        return np.fromiter((lookup[value] for value in values.tolist()), dtype=np.int16, count=values.size)
+
+    def add(self, names):
+        """
+        Register the names not seen yet.
+
+        Returns:
+            numpy.ndarray: Index of every given name
+        """
+        names = list(names)
+        new = [name for name in dict.fromkeys(names) if name not in self._index]
+        if new:
+            fields = parse_instrument_names(new)
+            expiries = self.expiries.tolist()
+            expiry_code = self._codes(fields['expiration_timestamp'], expiries)
+            self.expiries = np.asarray(expiries, dtype=np.int64)
+            underlying_code = self._codes(fields['underlying'], self.underlyings)
+
+            start = self.names.size
+            self.names = np.concatenate([self.names, np.asarray(new, dtype=object)])
+            self.underlying_code = np.concatenate([self.underlying_code, underlying_code])
+            self.expiry_code = np.concatenate([self.expiry_code, expiry_code])
+            self.strike = np.concatenate([self.strike, fields['strike']])
+            self.is_call = np.concatenate([self.is_call, fields['is_call']])
+            self.expiration_timestamp = np.concatenate([self.expiration_timestamp, fields['expiration_timestamp']])
+            self._index.update(zip(new, range(start, start + len(new))))
+            self._groups = None
+        return self.indexes(names)
+
+    def index(self, name):
+        return self._index[name]
+
+    def indexes(self, names, missing = None):
+        """
+        Index of each name. Unknown names raise a KeyError, or get `missing` if given (e.g. -1).
+        """
+        if missing is None:
+            return np.fromiter((self._index[name] for name in names), dtype=np.int64)
+        return np.fromiter((self._index.get(name, missing) for name in names), dtype=np.int64)
+
+    def option_type(self, indexes = slice(None)):
+        """
+        'call'/'put' strings for the pricers' option_type argument (the booleans in is_call work as well).
+        """
+        return np.where(self.is_call[indexes], 'call', 'put')
+
+    def days_to_maturity(self, timestamp, indexes = slice(None)):
+        """
+        Fractional days from timestamp (epoch milliseconds) to each instrument's expiry.
+
+        The pricers' days_to_maturity goes through year_fraction, which truncates to whole days to match
+        QuantLib's date arithmetic: options within 24 hours of expiry price as expired and 1.9 days as 1.
+        Use time_to_expiry() for the vectorized models (models.black_scholes, implied_volatility, fourier),
+        which take exact year fractions.
+        """
+        return (self.expiration_timestamp[indexes] - timestamp) / MS_PER_DAY
+
+    def time_to_expiry(self, timestamp, indexes = slice(None)):
+        """
+        Exact Actual/365 year fraction from timestamp (epoch milliseconds) to each instrument's expiry.
+        """
+        return self.days_to_maturity(timestamp, indexes) / DAYS_PER_YEAR
+
+    def active(self, timestamp):
+        """
+        Indexes of the instruments expiring after timestamp (epoch milliseconds).
+        """
+        return np.flatnonzero(self.expiration_timestamp > timestamp)
+
+    def _build_groups(self):
+        # One sort by (underlying, expiry, strike, put before call) gives every grouping as contiguous runs
+        order = np.lexsort((self.is_call, self.strike, self.expiration_timestamp, self.underlying_code))
+        expiry_keys = self.underlying_code[order].astype(np.int64) << 16 | self.expiry_code[order]
+        expiry_starts = np.flatnonzero(np.r_[True, expiry_keys[1:] != expiry_keys[:-1]])
+        expiry_bounds = np.r_[expiry_starts, order.size]
+
+        by_expiry = {}
+        by_strike = {}
+        for lo, hi in zip(expiry_bounds[:-1], expiry_bounds[1:]):
+            members = order[lo:hi]
+            key = (int(self.underlying_code[members[0]]), int(self.expiry_code[members[0]]))
+            by_expiry[key] = members
+            strikes, position = np.unique(self.strike[members], return_inverse=True)
+            pairs = np.full((strikes.size, 2), -1, dtype=np.int64)
+            pairs[position, self.is_call[members].astype(np.int64)] = members
+            by_strike[key] = (strikes, pairs)
+        self._groups = by_expiry, by_strike
+
+    def by_expiry(self):
+        """
+        Instruments grouped by expiry.
+
+        Returns:
+            dict: (underlying code, expiry code) -> indexes sorted by strike, puts before calls.
+                Expiry codes index self.expiries; groups are in expiry order per underlying
+        """
+        if self._groups is None:
+            self._build_groups()
+        return self._groups[0]
+
+    def by_strike(self):
+        """
+        Call/put pairs of each expiry's strikes, e.g. for put-call parity or one smile per expiry.
+
+        Returns:
+            dict: (underlying code, expiry code) -> (sorted strikes, (n_strikes, 2) array of
+                [put index, call index] with -1 where that side is not listed)
+        """
+        if self._groups is None:
+            self._build_groups()
+        return self._groups[1]
+
+    def frame(self, indexes = slice(None)):
+        """
+        DataFrame of the registry fields, indexed by instrument index.
+        """
+        index = np.arange(self.names.size)[indexes]
+        return pd.DataFrame({
+            'instrument_name': self.names[indexes],
+            'underlying': np.asarray(self.underlyings, dtype=object)[self.underlying_code[indexes]],
+            'expiration_timestamp': self.expiration_timestamp[indexes],
+            'strike': self.strike[indexes],
+            'is_call': self.is_call[indexes],
+            'expiry_code': self.expiry_code[indexes],
+        }, index=index)
@@ -0,0 +1,254 @@
+import asyncio
+import itertools
+import random
+import time
+from collections import deque
+
+from .deribit import DeribitError
+
+# Deribit's default limits for non-matching-engine requests: each costs 500 credits,
+# from a pool of 50,000 credits refilled at 10,000 per second (20 requests per second sustained)
+DEFAULT_COST = 500
+DEFAULT_CAPACITY = 50_000
+DEFAULT_REFILL_RATE = 10_000
+# JSON-RPC error codes worth retrying: too_many_requests and temporarily unavailable
+RETRYABLE_CODES = {10028, 10040, 10041, 13028}
+RATE_LIMIT_CODE = 10028
+
+
+class TokenBucket:
+    """
+    Token bucket modelling the exchange's rate-limit credits.
+
+    Args:
+        capacity (float): Maximum credits, the burst size
+        refill_rate (float): Credits added per second
+        clock (callable): Time source, defaults to time.monotonic
+    """
+    def __init__(self, capacity = DEFAULT_CAPACITY, refill_rate = DEFAULT_REFILL_RATE, clock = time.monotonic):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def try_acquire(self, cost = DEFAULT_COST):
+        self._refill()
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def delay(self, cost = DEFAULT_COST):
+        """
+        Seconds until cost credits are available.
+        """
+        self._refill()
+        return max(cost - self.tokens, 0.0) / self.refill_rate
+
+    async def acquire(self, cost = DEFAULT_COST):
+        # The lock makes waiters take credits in arrival order
+        async with self._lock:
+            while not self.try_acquire(cost):
+                await asyncio.sleep(self.delay(cost))
+
+    def drain(self):
+        """
+        Empty the bucket, e.g. after the exchange reports a rate-limit hit our model did not predict.
+        """
+        self._refill()
+        self.tokens = 0.0
+
+
+class EndpointMetrics:
+    """
+    Request, retry, error and latency counters for one endpoint. Latency percentiles use the last `window` requests.
+    """
+    def __init__(self, window = 1000):
+        self.requests = 0
+        self.successes = 0
+        self.errors = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.latencies = deque(maxlen=window)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else float('nan')
+
+        return {
+            'requests': self.requests,
+            'successes': self.successes,
+            'errors': self.errors,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'latency_mean': sum(latencies) / len(latencies) if latencies else float('nan'),
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': latencies[-1] if latencies else float('nan'),
+        }
+
+
+class RequestScheduler:
+    """
+    Rate-limit aware scheduler for market-data requests.
+
+    Requests wait in a priority queue (lowest priority value first, e.g. the expiry timestamp so front-month
+    instruments go first) and are sent by `concurrency` workers once the token bucket has credits for them.
+    Failures that are worth retrying (rate limits, maintenance, lost connections, timeouts) are requeued after
+    a jittered exponential backoff, at most max_retries times, without blocking the other requests; other
+    errors fail the request immediately.
+
+    Args:
+        client: Object with an async call(method, params), e.g. DeribitWebSocket
+        bucket (TokenBucket): Credit model, defaults to Deribit's default limits
+        concurrency (int): Requests in flight at once
+        max_retries (int): Retries per request before its error is returned
+        base_delay (float): Backoff before the first retry, in seconds, doubled on each retry
+        max_delay (float): Cap on the backoff
+        costs (dict): Method -> credits, others cost DEFAULT_COST
+    """
+    def __init__(self, client, bucket = None, concurrency = 20, max_retries = 3, base_delay = 0.1, max_delay = 5.0,
+                 costs = None):
+        self.client = client
+        self.bucket = bucket if bucket is not None else TokenBucket()
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.costs = costs or {}
+        self.metrics = {}
+        self._queue = None
+        self._workers = []
+        self._sequence = itertools.count()
+        self._delayed = set()
+        # Submitted requests not resolved yet, cancelled by stop()
+        self._futures = set()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """
+        Stop the workers. Requests still queued, waiting for a retry or in flight are cancelled,
+        so callers waiting on them (e.g. in run()) do not hang.
+        """
+        for handle in self._delayed:
+            handle.cancel()
+        self._delayed.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for future in list(self._futures):
+            future.cancel()
+        self._futures.clear()
+
+    def backoff(self, attempt):
+        """
+        Full-jitter exponential backoff: uniform in [0, min(max_delay, base_delay * 2^attempt)].
+        """
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def submit(self, method, params = None, priority = 0):
+        """
+        Queue a request.
+
+        Returns:
+            asyncio.Future: Resolves to the result, or to the last error once retries are exhausted
+        """
+        if not self._workers:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        self.metrics.setdefault(method, EndpointMetrics())
+        self._queue.put_nowait((priority, next(self._sequence), method, params, 0, future))
+        return future
+
+    async def run(self, calls, return_exceptions = True):
+        """
+        Submit (method, params, priority) triples and wait for all of them.
+
+        Returns:
+            list: Results in the order of calls
+        """
+        futures = [self.submit(*call) for call in calls]
+        return await asyncio.gather(*futures, return_exceptions=return_exceptions)
+
+    def _retryable(self, error):
+        if isinstance(error, DeribitError):
+            return error.code in RETRYABLE_CODES
+        return isinstance(error, (ConnectionError, asyncio.TimeoutError, OSError))
+
+    def _requeue(self, priority, method, params, attempt, future):
+        def put():
+            self._delayed.discard(handle)
+            self._queue.put_nowait((priority, next(self._sequence), method, params, attempt, future))
+        handle = asyncio.get_running_loop().call_later(self.backoff(attempt - 1), put)
+        self._delayed.add(handle)
+
+    async def _work(self):
+        while True:
+            priority, _, method, params, attempt, future = await self._queue.get()
+            if future.done():
+                continue
+            try:
+                await self._send(priority, method, params, attempt, future)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never let one request take its worker down with it
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _send(self, priority, method, params, attempt, future):
+        metrics = self.metrics[method]
+        await self.bucket.acquire(self.costs.get(method, DEFAULT_COST))
+        metrics.requests += 1
+        start = time.perf_counter()
+        try:
+            result = await self.client.call(method, params)
+        except Exception as e:
+            metrics.latencies.append(time.perf_counter() - start)
+            if isinstance(e, DeribitError) and e.code == RATE_LIMIT_CODE:
+                metrics.rate_limited += 1
+                self.bucket.drain()
+            if future.done():
+                # The caller cancelled or timed out while the request was in flight
+                metrics.errors += 1
+            elif self._retryable(e) and attempt < self.max_retries:
+                metrics.retries += 1
+                self._requeue(priority, method, params, attempt + 1, future)
+            else:
+                metrics.errors += 1
+                future.set_exception(e)
+        else:
+            metrics.latencies.append(time.perf_counter() - start)
+            metrics.successes += 1
+            if not future.done():
+                future.set_result(result)
+
+    def summary(self):
+        """
+        Per-endpoint metrics as a dict of dicts.
+        """
+        return {method: metrics.summary() for method, metrics in self.metrics.items()}
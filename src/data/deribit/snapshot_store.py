@@ -0,0 +1,271 @@
+import fcntl
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# Columns of the archived deribit_market_data table with their types, plus the instrument fields
+# needed to query chains without joining deribit_instruments
+MARKET_DATA_SCHEMA = pa.schema([
+    ('deribit_instruments_id', pa.int64()),
+    ('instrument_name', pa.string()),
+    ('option_type', pa.string()),
+    ('strike', pa.float64()),
+    ('expiration_timestamp', pa.int64()),
+    ('timestamp', pa.int64()),
+    ('timestamp_to_expiry', pa.int64()),
+    ('underlying_price', pa.float64()),
+    ('underlying_index', pa.string()),
+    ('mark_price', pa.float64()),
+    ('bid_price', pa.float64()),
+    ('ask_price', pa.float64()),
+    ('mid_price', pa.float64()),
+    ('low', pa.float64()),
+    ('last', pa.float64()),
+    ('high', pa.float64()),
+    ('open_interest', pa.float64()),
+    ('interest_rate', pa.float64()),
+    ('volume', pa.float64()),
+    ('volume_usd', pa.float64()),
+    ('volume_notional', pa.float64()),
+    ('price_change', pa.float64()),
+    ('estimated_delivery_price', pa.float64()),
+    ('current_funding', pa.float64()),
+    ('funding_8h', pa.float64()),
+    ('forward_price', pa.float64()),
+    ('log_simple_moneyness', pa.float64()),
+    ('implied_volatility', pa.float64()),
+    ('delta', pa.float64()),
+    ('gamma', pa.float64()),
+    ('theta', pa.float64()),
+    ('vega', pa.float64()),
+    ('expected_move', pa.float64()),
+])
+PARTITION_SCHEMA = pa.schema([
+    ('currency', pa.string()),
+    ('date', pa.string()),
+    ('expiry', pa.string()),
+])
+DATASET_SCHEMA = pa.schema(list(MARKET_DATA_SCHEMA) + list(PARTITION_SCHEMA))
+# Directories of an in-progress compaction. The leading dot keeps pyarrow's dataset discovery off them
+STAGING_PREFIX = '.compacting-'
+REPLACED_PREFIX = '.replaced-'
+LEGACY_STAGING_SUFFIX = '.compacting'
+# Held shared by write() and exclusively by compact() and recover(), across processes
+LOCK_FILE = '.lock'
+
+
+def _day(timestamp_ms):
+    """
+    UTC date partition value(s) of epoch millisecond timestamp(s).
+    """
+    if np.ndim(timestamp_ms):
+        return np.asarray(pd.to_datetime(np.asarray(timestamp_ms), unit='ms', utc=True).strftime('%Y-%m-%d'))
+    return pd.Timestamp(int(timestamp_ms), unit='ms', tz='UTC').strftime('%Y-%m-%d')
+
+
+class SnapshotStore:
+    """
+    Local Parquet store for option-chain snapshots, hive-partitioned as currency=BTC/date=2024-01-31/expiry=2024-03-29.
+
+    Each write() adds one file per (date, expiry) partition. Reads go through pyarrow.dataset: partitions
+    outside the timestamp and expiry ranges are pruned from the directory names, remaining predicates
+    (timestamps, moneyness) are pushed down to the Parquet row-group statistics, and only the requested
+    columns are decoded. compact() merges a day's many small snapshot files into one per expiry.
+
+    Writers and compaction serialize on a lock file in the root, so a compaction never drops a concurrent
+    write. Opening the store does not touch the files: call recover() from the writer after a crash.
+
+    Args:
+        root (str): Directory of the store
+    """
+    def __init__(self, root):
+        self.root = root
+        self.partitioning = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+        os.makedirs(root, exist_ok=True)
+
+    @contextmanager
+    def _lock(self, exclusive):
+        with open(os.path.join(self.root, LOCK_FILE), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _table(self, df, currency):
+        missing = [name for name in ('timestamp', 'expiration_timestamp') if name not in df]
+        if missing:
+            raise KeyError(f"Snapshot is missing columns {missing}")
+        frame = df.reindex(columns=MARKET_DATA_SCHEMA.names)
+        table = pa.Table.from_pandas(frame, schema=MARKET_DATA_SCHEMA, preserve_index=False, safe=False)
+        rows = len(frame)
+        table = table.append_column('currency', pa.array([currency] * rows, pa.string()))
+        table = table.append_column('date', pa.array(_day(frame['timestamp']), pa.string()))
+        return table.append_column('expiry', pa.array(_day(frame['expiration_timestamp']), pa.string()))
+
+    def write(self, df, currency):
+        """
+        Append a snapshot (one or more timestamps) of a currency's chain.
+
+        Args:
+            df (pd.DataFrame): Columns from MARKET_DATA_SCHEMA, at least timestamp and expiration_timestamp
+                (epoch milliseconds); missing columns are stored as nulls
+            currency (str): e.g. 'BTC'
+        """
+        table = self._table(df, currency)
+        # Rows sorted by expiry and strike give tight row-group statistics for moneyness filters
+        table = table.sort_by([('expiration_timestamp', 'ascending'), ('strike', 'ascending')])
+        with self._lock(exclusive=False):
+            ds.write_dataset(table, self.root, format='parquet', partitioning=self.partitioning,
+                             basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                             existing_data_behavior='overwrite_or_ignore')
+
+    def dataset(self):
+        return ds.dataset(self.root, format='parquet', partitioning=self.partitioning, schema=DATASET_SCHEMA)
+
+    def filter(self, currency = None, start = None, end = None, expiry_start = None, expiry_end = None,
+               moneyness = None):
+        """
+        Dataset filter expression, see read(). Timestamps are epoch milliseconds or anything pd.Timestamp accepts.
+        """
+        expression = ds.scalar(True)
+        if currency is not None:
+            expression &= ds.field('currency') == currency
+        if start is not None:
+            start = _milliseconds(start)
+            expression &= (ds.field('date') >= _day(start)) & (ds.field('timestamp') >= start)
+        if end is not None:
+            end = _milliseconds(end)
+            expression &= (ds.field('date') <= _day(end)) & (ds.field('timestamp') <= end)
+        if expiry_start is not None:
+            expiry_start = _milliseconds(expiry_start)
+            expression &= (ds.field('expiry') >= _day(expiry_start)) & (ds.field('expiration_timestamp') >= expiry_start)
+        if expiry_end is not None:
+            expiry_end = _milliseconds(expiry_end)
+            expression &= (ds.field('expiry') <= _day(expiry_end)) & (ds.field('expiration_timestamp') <= expiry_end)
+        if moneyness is not None:
+            lower, upper = moneyness
+            expression &= (ds.field('log_simple_moneyness') >= lower) & (ds.field('log_simple_moneyness') <= upper)
+        return expression
+
+    def read(self, columns = None, currency = None, start = None, end = None, expiry_start = None,
+             expiry_end = None, moneyness = None, as_table = False):
+        """
+        Load snapshots with column projection and predicate pushdown.
+
+        Args:
+            columns (list): Columns to load, defaults to all
+            currency (str): Only this currency
+            start, end: Inclusive snapshot timestamp range
+            expiry_start, expiry_end: Inclusive expiration timestamp range
+            moneyness (tuple): Inclusive (lower, upper) range of log_simple_moneyness
+            as_table (bool): Return a pyarrow.Table instead of a DataFrame
+
+        Returns:
+            pd.DataFrame or pa.Table
+        """
+        expression = self.filter(currency, start, end, expiry_start, expiry_end, moneyness)
+        table = self.dataset().to_table(columns=columns, filter=expression)
+        return table if as_table else table.to_pandas()
+
+    def _day_dirs(self):
+        for currency_dir in os.scandir(self.root):
+            if currency_dir.is_dir() and currency_dir.name.startswith('currency='):
+                for day_dir in os.scandir(currency_dir.path):
+                    if day_dir.is_dir() and day_dir.name.startswith('date='):
+                        yield day_dir.path
+
+    @staticmethod
+    def _recover_day(day_dir):
+        """
+        Finish or roll back an interrupted compaction of one day.
+        """
+        names = os.listdir(day_dir)
+        for name in names:
+            if name.startswith(STAGING_PREFIX):
+                target = name[len(STAGING_PREFIX):]
+            elif name.endswith(LEGACY_STAGING_SUFFIX):
+                target = name[:-len(LEGACY_STAGING_SUFFIX)]
+            else:
+                continue
+            staging = os.path.join(day_dir, name)
+            if os.path.exists(os.path.join(day_dir, target)):
+                # Crashed while writing the staging copy: the original partition is intact
+                shutil.rmtree(staging)
+            else:
+                # Crashed after moving the original aside: the staging copy is complete
+                os.rename(staging, os.path.join(day_dir, target))
+        for name in names:
+            if name.startswith(REPLACED_PREFIX):
+                replaced = os.path.join(day_dir, name)
+                target = os.path.join(day_dir, name[len(REPLACED_PREFIX):])
+                if os.path.exists(target):
+                    shutil.rmtree(replaced)
+                else:
+                    os.rename(replaced, target)
+
+    def recover(self):
+        """
+        Clean up after compactions interrupted by a crash, so no partition is lost or read twice.
+        Waits for writes and compactions in progress.
+        """
+        with self._lock(exclusive=True):
+            for day_dir in self._day_dirs():
+                self._recover_day(day_dir)
+
+    def compact(self, currency, date):
+        """
+        Rewrite each expiry partition of a day as a single file sorted by timestamp, expiry and strike.
+
+        The new file is written to a staging directory; the old partition is then renamed aside, the staging
+        directory renamed into its place and only then the old files deleted, so a crash at any point leaves
+        either the old or the new partition in place (see recover()). Holds the store's lock throughout,
+        so writes wait for it. A reader can miss a partition for the instant between the two renames.
+
+        Returns:
+            int: Number of partitions rewritten
+        """
+        day_dir = os.path.join(self.root, f"currency={currency}", f"date={date}")
+        with self._lock(exclusive=True):
+            if not os.path.isdir(day_dir):
+                return 0
+            self._recover_day(day_dir)
+            return self._compact_day(day_dir)
+
+    @staticmethod
+    def _compact_day(day_dir):
+        rewritten = 0
+        for expiry_dir in sorted(os.listdir(day_dir)):
+            path = os.path.join(day_dir, expiry_dir)
+            if expiry_dir.startswith('.') or not os.path.isdir(path):
+                continue
+            files = [name for name in os.listdir(path) if name.endswith('.parquet')]
+            if len(files) <= 1:
+                continue
+            table = ds.dataset(path, format='parquet', schema=MARKET_DATA_SCHEMA).to_table()
+            table = table.sort_by([('timestamp', 'ascending'), ('expiration_timestamp', 'ascending'),
+                                   ('strike', 'ascending')])
+            staging = os.path.join(day_dir, STAGING_PREFIX + expiry_dir)
+            replaced = os.path.join(day_dir, REPLACED_PREFIX + expiry_dir)
+            ds.write_dataset(table, staging, format='parquet', basename_template="compacted-{i}.parquet",
+                             existing_data_behavior='delete_matching')
+            os.rename(path, replaced)
+            os.rename(staging, path)
+            shutil.rmtree(replaced)
+            rewritten += 1
+        return rewritten
+
+
+def _milliseconds(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return timestamp.value // 1_000_000
@@ -0,0 +1,175 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'DAOTS001'
+HEADER_SIZE = 4096
+# Header layout: magic (8 bytes), committed record count (uint64), dtype description length (uint32), dtype JSON
+_COUNT_OFFSET = 8
+_DESCR_OFFSET = 20
+
+# Timestamps are epoch milliseconds, as in Deribit's API
+BAR_DTYPE = np.dtype([('timestamp', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                      ('close', '<f8'), ('volume', '<f8')])
+TICK_DTYPE = np.dtype([('timestamp', '<i8'), ('price', '<f8'), ('amount', '<f8'), ('direction', '<i1')])
+
+
+def _milliseconds(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return timestamp.value // 1_000_000
+
+
+class MemoryMappedSeries:
+    """
+    Append-only memory-mapped file of fixed-width records sorted by timestamp, for bar and tick series.
+
+    Records are read through np.memmap, so views are zero-copy and every process mapping the same file
+    shares one copy in the page cache. A single writer appends by writing the records past the end
+    and only then publishing the new committed count in the header, so readers (in any process) see
+    a consistent prefix and pick up appends on their next view() or range() call.
+
+    Args:
+        path (str): File path
+        dtype (np.dtype): Record dtype with an int64 'timestamp' field, e.g. BAR_DTYPE. Needed to create a file,
+            read from the header otherwise
+        mode (str): 'r' to read, 'a' to append (creating the file if needed)
+    """
+    def __init__(self, path, dtype = None, mode = 'r'):
+        if mode not in ('r', 'a'):
+            raise ValueError(f"Unknown mode {mode}, expected 'r' or 'a'")
+        self.path = path
+        self.mode = mode
+        if mode == 'a' and not os.path.exists(path):
+            if dtype is None:
+                raise ValueError(f"Creating {path} needs a record dtype")
+            self._create(path, np.dtype(dtype))
+        self._fd = os.open(path, os.O_RDWR if mode == 'a' else os.O_RDONLY)
+        self.dtype = self._read_dtype()
+        if dtype is not None and np.dtype(dtype) != self.dtype:
+            raise ValueError(f"{path} holds records of {self.dtype}, not {np.dtype(dtype)}")
+        if 'timestamp' not in self.dtype.names:
+            raise ValueError("Records need a 'timestamp' field")
+        self._memmap = None
+
+    @staticmethod
+    def _create(path, dtype):
+        descr = json.dumps(np.lib.format.dtype_to_descr(dtype)).encode()
+        if _DESCR_OFFSET + len(descr) > HEADER_SIZE:
+            raise ValueError("Record dtype description does not fit in the header")
+        header = bytearray(HEADER_SIZE)
+        header[:8] = MAGIC
+        header[_COUNT_OFFSET:_COUNT_OFFSET + 8] = np.uint64(0).tobytes()
+        header[16:_DESCR_OFFSET] = np.uint32(len(descr)).tobytes()
+        header[_DESCR_OFFSET:_DESCR_OFFSET + len(descr)] = descr
+        with open(path, 'wb') as f:
+            f.write(header)
+
+    def _read_dtype(self):
+        header = os.pread(self._fd, HEADER_SIZE, 0)
+        if header[:8] != MAGIC:
+            raise ValueError(f"{self.path} is not a time-series store file")
+        length = int(np.frombuffer(header[16:_DESCR_OFFSET], dtype=np.uint32)[0])
+        descr = json.loads(header[_DESCR_OFFSET:_DESCR_OFFSET + length])
+        # JSON turns the (name, format) tuples of structured dtypes into lists
+        return np.lib.format.descr_to_dtype([tuple(field) for field in descr] if isinstance(descr, list) else descr)
+
+    def __len__(self):
+        return int(np.frombuffer(os.pread(self._fd, 8, _COUNT_OFFSET), dtype=np.uint64)[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._memmap = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def view(self):
+        """
+        Zero-copy structured array of every committed record. Views stay valid after later appends.
+        """
+        count = len(self)
+        if self._memmap is None or self._memmap.shape[0] < count:
+            if count == 0:
+                return np.empty(0, dtype=self.dtype)
+            self._memmap = np.memmap(self.path, dtype=self.dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+        return self._memmap[:count]
+
+    def range(self, start = None, end = None):
+        """
+        Zero-copy view of the records with start <= timestamp <= end, found by binary search.
+        Bounds are epoch milliseconds or anything pd.Timestamp accepts, None for open ends.
+        """
+        records = self.view()
+        timestamps = records['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(timestamps, _milliseconds(start), side='left'))
+        hi = records.shape[0] if end is None else int(np.searchsorted(timestamps, _milliseconds(end), side='right'))
+        return records[lo:hi]
+
+    def columns(self, start = None, end = None):
+        """
+        Dict of zero-copy field views over a timestamp range. fused_volatilities and calculate_all_volatilities
+        in models.realized_volatility take it directly and index their rows by position, 0..n-1
+        (the 'timestamp' view gives each row's time).
+        """
+        records = self.range(start, end)
+        return {name: records[name] for name in self.dtype.names}
+
+    def frame(self, start = None, end = None):
+        """
+        DataFrame of a timestamp range. pandas may copy the strided field views, use columns() to avoid it.
+        """
+        return pd.DataFrame(self.columns(start, end))
+
+    def _records(self, data):
+        if isinstance(data, np.ndarray) and data.dtype == self.dtype:
+            return np.ascontiguousarray(data)
+        records = np.empty(len(data[self.dtype.names[0]]), dtype=self.dtype)
+        for name in self.dtype.names:
+            records[name] = np.asarray(data[name])
+        return records
+
+    def append(self, data, durable = False):
+        """
+        Append records in timestamp order, after the last committed record.
+
+        Args:
+            data: Structured array of the store's dtype, DataFrame or dict of arrays with its fields
+            durable (bool): fsync the data before publishing the new count
+
+        Returns:
+            int: Committed record count
+        """
+        if self.mode != 'a':
+            raise PermissionError(f"{self.path} is open read-only")
+        records = self._records(data)
+        count = len(self)
+        if records.size == 0:
+            return count
+        timestamps = records['timestamp']
+        if np.any(np.diff(timestamps) < 0):
+            raise ValueError("Appended records must be sorted by timestamp")
+        if count:
+            field_dtype, field_offset = self.dtype.fields['timestamp'][:2]
+            position = HEADER_SIZE + (count - 1) * self.dtype.itemsize + field_offset
+            last = int(np.frombuffer(os.pread(self._fd, field_dtype.itemsize, position), dtype=field_dtype)[0])
+            if timestamps[0] < last:
+                raise ValueError(f"Appended records start at {timestamps[0]}, before the last record at {last}")
+
+        os.pwrite(self._fd, records.tobytes(), HEADER_SIZE + count * self.dtype.itemsize)
+        if durable:
+            os.fsync(self._fd)
+        # Publishing the count last keeps readers from seeing partially written records
+        count += records.size
+        os.pwrite(self._fd, np.uint64(count).tobytes(), _COUNT_OFFSET)
+        return count
@@ -0,0 +1,164 @@
+import QuantLib as ql
+
+from .models.black_scholes import is_call
+
+
+def set_evaluation_date(calculation_date):
+    """
+    Set the global QuantLib evaluation date only when it actually changes.
+    Assigning the same date still notifies every observer, so repeated pricing calls
+    would otherwise invalidate all cached results.
+    """
+    settings = ql.Settings.instance()
+    if settings.evaluationDate != calculation_date:
+        settings.evaluationDate = calculation_date
+
+
+def ql_option_type(option_type):
+    """
+    QuantLib option code of any flag is_call accepts (ql.Option codes, OptionType, booleans, 'call'/'put').
+    """
+    return ql.Option.Call if is_call(option_type) else ql.Option.Put
+
+
+class MarketState:
+    """
+    Long-lived market objects for repricing without rebuilding QuantLib graphs.
+
+    Each underlying owns SimpleQuotes for spot, risk-free rate and dividend yield, with flat
+    term structures built on top of them. Each (underlying, expiry) owns a volatility quote and
+    a BlackScholesMertonProcess. Options built through the market state are cached, so a spot
+    or vol update is a single setValue and QuantLib's observer/lazy-object machinery only
+    recalculates the instruments that depend on the changed quote.
+
+    Term structures float with the evaluation date (zero settlement days on a NullCalendar,
+    crypto trades every day), so moving the calculation date keeps the graph valid.
+
+    Args:
+        calculation_date (ql.Date): Evaluation date
+        day_count (ql.DayCounter): Day counting convention, defaults to Actual365Fixed
+    """
+    def __init__(self, calculation_date, day_count = None):
+        self.day_count = day_count if day_count is not None else ql.Actual365Fixed()
+        self.calendar = ql.NullCalendar()
+        self.calculation_date = calculation_date
+        set_evaluation_date(calculation_date)
+
+        self._spots = {}
+        self._rf_rates = {}
+        self._divs = {}
+        self._curves = {}
+        self._vols = {}
+        self._processes = {}
+        self._engines = {}
+        self._options = {}
+
+    def set_calculation_date(self, calculation_date):
+        self.calculation_date = calculation_date
+        set_evaluation_date(calculation_date)
+
+    def maturity_date(self, days_to_maturity):
+        return ql.Date(self.calculation_date.serialNumber() + int(days_to_maturity))
+
+    def add_underlying(self, underlying, spot, rf_rate, div):
+        """
+        Register an underlying (e.g. 'BTC') with its spot, risk-free rate and dividend yield.
+        Re-adding an existing underlying only updates its quotes.
+        """
+        if underlying in self._spots:
+            self.set_spot(underlying, spot)
+            self.set_rf_rate(underlying, rf_rate)
+            self.set_div(underlying, div)
+            return
+
+        self._spots[underlying] = ql.SimpleQuote(spot)
+        self._rf_rates[underlying] = ql.SimpleQuote(rf_rate)
+        self._divs[underlying] = ql.SimpleQuote(div)
+        self._curves[underlying] = (
+            ql.YieldTermStructureHandle(ql.FlatForward(0, self.calendar, ql.QuoteHandle(self._divs[underlying]), self.day_count)),
+            ql.YieldTermStructureHandle(ql.FlatForward(0, self.calendar, ql.QuoteHandle(self._rf_rates[underlying]), self.day_count)),
+        )
+
+    def set_spot(self, underlying, spot):
+        self._spots[underlying].setValue(spot)
+
+    def set_rf_rate(self, underlying, rf_rate):
+        self._rf_rates[underlying].setValue(rf_rate)
+
+    def set_div(self, underlying, div):
+        self._divs[underlying].setValue(div)
+
+    def set_vol(self, underlying, maturity_date, sigma):
+        """
+        Set the volatility for one expiry of an underlying, creating its process on first use.
+        """
+        key = (underlying, maturity_date.serialNumber())
+        if key in self._vols:
+            self._vols[key].setValue(sigma)
+        else:
+            self._vols[key] = ql.SimpleQuote(sigma)
+        return self.process(underlying, maturity_date)
+
+    def process(self, underlying, maturity_date):
+        """
+        Return the cached BlackScholesMertonProcess for an underlying and expiry.
+        """
+        key = (underlying, maturity_date.serialNumber())
+        if key not in self._processes:
+            if key not in self._vols:
+                raise KeyError(f"No volatility set for {underlying} expiring {maturity_date}")
+            dividendTS, riskFreeTS = self._curves[underlying]
+            volTS = ql.BlackVolTermStructureHandle(
+                ql.BlackConstantVol(0, self.calendar, ql.QuoteHandle(self._vols[key]), self.day_count))
+            self._processes[key] = ql.BlackScholesMertonProcess(
+                ql.QuoteHandle(self._spots[underlying]), dividendTS, riskFreeTS, volTS)
+        return self._processes[key]
+
+    def option(self, pricer, underlying, strike, maturity_date, option_type = None):
+        """
+        Return a cached VanillaOption priced with the pricer's engine on this market state.
+
+        Args:
+            pricer (Pricer): Pricer from src/pricer.py with a QuantLib engine on a Black-Scholes-Merton process,
+                used for its engine and default option type
+            underlying (str): Underlying registered with add_underlying
+            strike (float): Strike price
+            maturity_date (ql.Date): Expiry date
+            option_type: Any flag is_call accepts (ql.Option codes, OptionType, 'call'/'put'),
+                defaults to the pricer's option type
+
+        Returns:
+            ql.VanillaOption: Option whose NPV tracks the market quotes
+        """
+        # Heston and Bates pricers build their own process, which the market state does not model
+        if not hasattr(pricer, 'engine') or hasattr(pricer, 'process'):
+            raise TypeError(f"{type(pricer).__name__} has no QuantLib engine on a Black-Scholes-Merton process, "
+                            f"MarketState cannot price with it")
+        if option_type is None:
+            option_type = pricer.option_type
+        option_type = ql_option_type(option_type)
+        key = (pricer, underlying, float(strike), maturity_date.serialNumber(), option_type)
+        option = self._options.get(key)
+        if option is None:
+            engine_key = (pricer, underlying, maturity_date.serialNumber())
+            engine = self._engines.get(engine_key)
+            if engine is None:
+                engine = pricer.engine(self.process(underlying, maturity_date))
+                self._engines[engine_key] = engine
+
+            payoff = ql.PlainVanillaPayoff(option_type, strike)
+            option = ql.VanillaOption(payoff, ql.EuropeanExercise(maturity_date))
+            option.setPricingEngine(engine)
+            self._options[key] = option
+        return option
+
+    def price(self, pricer, underlying, strike, days_to_maturity, option_type = None):
+        maturity_date = self.maturity_date(days_to_maturity)
+        return self.option(pricer, underlying, strike, maturity_date, option_type).NPV()
+
+    def clear_options(self):
+        """
+        Drop cached options and engines, e.g. after instruments expire.
+        """
+        self._options.clear()
+        self._engines.clear()
@@ -0,0 +1,94 @@
+import numpy as np
+
+from .black_scholes import bsm_price, is_call
+
+
+def _crr_lattice(S, K, sigma, r, T, q, sign, steps, smooth=False):
+    """
+    Backward induction of a Cox-Ross-Rubinstein tree for a batch of European options.
+    Inputs are row vectors of shape (options,). The lattice is one (steps + 1, options) array,
+    node-major so each backward step works on contiguous rows, updated in place with a
+    single scratch buffer of the same shape.
+    With smooth=True the last step is replaced by the closed-form price (binomial Black-Scholes),
+    which removes the payoff kink that makes CRR errors oscillate with the step count.
+    """
+    dt = T / steps
+    dx = sigma * np.sqrt(dt)
+    # Same up probability as QuantLib's "crr" tree: drift of log(S) matched on each step
+    p_up = 0.5 + 0.5 * (r - q - 0.5 * sigma ** 2) * dt / dx
+    discount = np.exp(-r * dt)
+    p_up_disc = discount * p_up
+    p_down_disc = discount * (1.0 - p_up)
+
+    last = steps - 1 if smooth else steps
+    nodes = np.arange(last + 1, dtype=np.float64)[:, None]
+    values = S * np.exp(dx * (2.0 * nodes - last))
+    if smooth:
+        values = bsm_price(values, K, sigma, r, dt, q, sign > 0.0)
+    else:
+        np.subtract(values, K, out=values)
+        np.multiply(values, sign, out=values)
+        np.maximum(values, 0.0, out=values)
+
+    scratch = np.empty_like(values)
+    for j in range(last - 1, -1, -1):
+        up = scratch[:j + 1]
+        np.multiply(values[1:j + 2], p_up_disc, out=up)
+        down = values[:j + 1]
+        np.multiply(down, p_down_disc, out=down)
+        np.add(down, up, out=down)
+    return values[0]
+
+
+def crr_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type,
+              steps=200, extrapolation=None, batch_size=4096, smooth=False):
+    """
+    Vectorized CRR binomial prices of European options for a whole chain
+
+    Parameters:
+    -----------
+    underlying, strike, sigma, rf_rate, time_to_expiry, div : array-like
+        Black-Scholes-Merton inputs, time in years, broadcast together
+    option_type : scalar or array-like
+        Call/put flags, see black_scholes.is_call
+    steps : int, default 200
+        Number of time steps in the tree
+    extrapolation : {None, 'odd_even', 'richardson'}, default None
+        None prices a single tree with `steps` steps.
+        'odd_even' averages the trees with steps and steps + 1, cancelling CRR's odd/even oscillation.
+        'richardson' prices smoothed trees (closed-form last step) with steps and 2 * steps and
+        combines them as 2 * P(2 * steps) - P(steps), removing the leading O(1/steps) error term.
+    batch_size : int, default 4096
+        Options per lattice, memory is O(batch_size x steps)
+    smooth : bool, default False
+        Replace the last tree step by the closed-form price, see _crr_lattice
+
+    Returns:
+    --------
+    numpy.ndarray
+        Option prices, broadcast over the inputs
+    """
+    if extrapolation == 'odd_even':
+        return 0.5 * (crr_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type, steps, None, batch_size, smooth)
+                      + crr_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type, steps + 1, None, batch_size, smooth))
+    if extrapolation == 'richardson':
+        coarse = crr_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type, steps, None, batch_size, True)
+        fine = crr_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type, 2 * steps, None, batch_size, True)
+        return 2.0 * fine - coarse
+    if extrapolation is not None:
+        raise ValueError(f"Unknown extrapolation {extrapolation}, expected None, 'odd_even' or 'richardson'")
+
+    S, K, sigma, r, T, q = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in
+                                                 (underlying, strike, sigma, rf_rate, time_to_expiry, div)))
+    shape = S.shape
+    call = np.broadcast_to(is_call(option_type), shape).ravel()
+    S, K, sigma, r, T, q = (x.ravel() for x in (S, K, sigma, r, T, q))
+    sign = np.where(call, 1.0, -1.0)
+
+    # Degenerate trees (expired or zero volatility) take the closed-form limit
+    prices = bsm_price(S, K, sigma, r, T, q, call)
+    lattice = np.flatnonzero(sigma * np.sqrt(T) > 0.0)
+    for start in range(0, lattice.size, batch_size):
+        rows = lattice[start:start + batch_size]
+        prices[rows] = _crr_lattice(*(x[rows] for x in (S, K, sigma, r, T, q, sign)), steps, smooth)
+    return prices.reshape(shape)
@@ -0,0 +1,194 @@
+from enum import Enum
+
+import numpy as np
+from scipy.special import ndtr
+
+# Actual/365 Fixed, the day count used by the QuantLib pricers in src/pricer.py
+DAYS_PER_YEAR = 365.0
+
+
+def is_call(option_type):
+    """
+    Convert option type flags to a boolean call mask
+
+    Parameters:
+    -----------
+    option_type : scalar or array-like
+        QuantLib codes (ql.Option.Call = 1, ql.Option.Put = -1), OptionType values
+        (Call = 1, Put = 0), booleans, or strings such as 'call'/'put'/'C'/'P'
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array, True where the option is a call
+    """
+    option_type = np.asarray(option_type)
+    if option_type.dtype == object:
+        # Enum members (OptionType.Call) carry their code in .value, str() would give 'OptionType.Call'
+        values = [value.value if isinstance(value, Enum) else value for value in option_type.ravel().tolist()]
+        option_type = np.asarray(values).reshape(option_type.shape)
+    if option_type.dtype.kind in 'USO':
+        return np.char.startswith(np.char.lower(option_type.astype(str)), 'c')
+    return option_type.astype(np.int64) == 1
+
+
+def year_fraction(days_to_maturity):
+    """
+    Convert days to maturity into an Actual/365 Fixed year fraction.
+    Days are truncated to whole days, the same way the QuantLib pricers build the maturity date.
+
+    Parameters:
+    -----------
+    days_to_maturity : array-like
+        Days until expiry
+
+    Returns:
+    --------
+    numpy.ndarray
+        Time to expiry in years
+    """
+    return np.trunc(np.asarray(days_to_maturity, dtype=np.float64)) / DAYS_PER_YEAR
+
+
+def bsm_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type):
+    """
+    Vectorized Black-Scholes-Merton price for European options
+
+    Parameters:
+    -----------
+    underlying : array-like
+        Spot price of the underlying asset
+    strike : array-like
+        Strike price
+    sigma : array-like
+        Volatility of the underlying asset
+    rf_rate : array-like
+        Continuously compounded risk-free rate
+    time_to_expiry : array-like
+        Time to expiry in years
+    div : array-like
+        Continuously compounded dividend yield or funding cost
+    option_type : scalar or array-like
+        Call/put flags, see is_call
+
+    Returns:
+    --------
+    numpy.ndarray
+        Option prices, broadcast over the inputs
+    """
+    S = np.asarray(underlying, dtype=np.float64)
+    K = np.asarray(strike, dtype=np.float64)
+    sigma = np.asarray(sigma, dtype=np.float64)
+    T = np.asarray(time_to_expiry, dtype=np.float64)
+    call = is_call(option_type)
+
+    discount = np.exp(-np.asarray(rf_rate, dtype=np.float64) * T)
+    forward = S * np.exp(-np.asarray(div, dtype=np.float64) * T) / discount
+    std_dev = sigma * np.sqrt(T)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = np.log(forward / K) / std_dev + 0.5 * std_dev
+    d2 = d1 - std_dev
+
+    # Put prices reuse the call formula with negated d1/d2 and swapped legs
+    sign = np.where(call, 1.0, -1.0)
+    price = sign * discount * (forward * ndtr(sign * d1) - K * ndtr(sign * d2))
+
+    # Zero-volatility options are worth their discounted intrinsic value and,
+    # as in QuantLib, options expiring on the evaluation date are worth nothing
+    intrinsic = discount * np.maximum(sign * (forward - K), 0.0)
+    price = np.where(std_dev > 0.0, price, intrinsic)
+    return np.where(T > 0.0, price, 0.0)
+
+
+GREEKS = ('price', 'delta', 'gamma', 'vega', 'theta', 'rho', 'vanna', 'volga', 'expected_move')
+
+
+def bsm_greeks(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type, greeks=None):
+    """
+    Vectorized Black-Scholes-Merton price and Greeks in one pass from shared intermediates
+
+    d1, d2, the discount factors, N(d1), N(d2) and the density at d1 are computed once and reused
+    by every output. Sensitivities follow QuantLib's conventions: vega and volga per unit of
+    volatility, theta per year, rho per unit of rate (divide by 100 or 365 for per-point/per-day).
+
+    Parameters:
+    -----------
+    underlying, strike, sigma, rf_rate, time_to_expiry, div : array-like
+        Black-Scholes-Merton inputs, time in years, broadcast together
+    option_type : scalar or array-like
+        Call/put flags, see is_call
+    greeks : iterable of str, optional
+        Subset of GREEKS to return, defaults to all of them
+
+    Returns:
+    --------
+    dict
+        Output name -> numpy.ndarray
+    """
+    greeks = GREEKS if greeks is None else tuple(greeks)
+    unknown = set(greeks) - set(GREEKS)
+    if unknown:
+        raise ValueError(f"Unknown greeks {sorted(unknown)}, expected a subset of {GREEKS}")
+
+    S = np.asarray(underlying, dtype=np.float64)
+    K = np.asarray(strike, dtype=np.float64)
+    sigma = np.asarray(sigma, dtype=np.float64)
+    r = np.asarray(rf_rate, dtype=np.float64)
+    q = np.asarray(div, dtype=np.float64)
+    T = np.asarray(time_to_expiry, dtype=np.float64)
+    sign = np.where(is_call(option_type), 1.0, -1.0)
+
+    sqrt_t = np.sqrt(T)
+    std_dev = sigma * sqrt_t
+    discount = np.exp(-r * T)
+    div_discount = np.exp(-q * T)
+    spot_discounted = S * div_discount
+    strike_discounted = K * discount
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = np.log(spot_discounted / strike_discounted) / std_dev + 0.5 * std_dev
+        d2 = d1 - std_dev
+        n_d1 = ndtr(sign * d1)
+        n_d2 = ndtr(sign * d2)
+        pdf_d1 = np.exp(-0.5 * d1 * d1) / np.sqrt(2.0 * np.pi)
+        spot_pdf = spot_discounted * pdf_d1
+
+        computed = {}
+        if 'price' in greeks:
+            computed['price'] = sign * (spot_discounted * n_d1 - strike_discounted * n_d2)
+        if 'delta' in greeks:
+            computed['delta'] = sign * div_discount * n_d1
+        if 'gamma' in greeks:
+            computed['gamma'] = div_discount * pdf_d1 / (S * std_dev)
+        if 'vega' in greeks or 'volga' in greeks:
+            vega = spot_pdf * sqrt_t
+            computed['vega'] = vega
+        if 'theta' in greeks:
+            computed['theta'] = (-spot_pdf * sigma / (2.0 * sqrt_t)
+                                 - sign * r * strike_discounted * n_d2
+                                 + sign * q * spot_discounted * n_d1)
+        if 'rho' in greeks:
+            computed['rho'] = sign * T * strike_discounted * n_d2
+        if 'vanna' in greeks:
+            computed['vanna'] = -div_discount * pdf_d1 * d2 / sigma
+        if 'volga' in greeks:
+            computed['volga'] = vega * d1 * d2 / sigma
+        if 'expected_move' in greeks:
+            computed['expected_move'] = S * std_dev
+
+    # Degenerate inputs: zero-volatility options keep their intrinsic price and step delta,
+    # and, as in QuantLib, options expiring on the evaluation date are worth nothing
+    live = std_dev > 0.0
+    alive = T > 0.0
+    results = {}
+    for name in greeks:
+        values = computed[name]
+        if name == 'price':
+            values = np.where(live, values, discount * np.maximum(sign * (S * div_discount / discount - K), 0.0))
+        elif name == 'delta':
+            values = np.where(live, values, np.where(sign * (spot_discounted - strike_discounted) > 0.0, sign * div_discount, 0.0))
+        elif name != 'expected_move':
+            values = np.where(live, values, 0.0)
+        results[name] = np.where(alive, values, 0.0)
+    return results
@@ -0,0 +1,146 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.linalg import solve_banded
+
+from .black_scholes import bsm_price, is_call
+
+
+def _boundaries(x_min, x_max, tau, r, q):
+    """
+    Dirichlet values of the scaled call and put prices u = V / K at the ends of the log-moneyness grid.
+    Returns arrays of shape (2,) for the lower and upper boundary, ordered (call, put).
+    """
+    lower = np.array([0.0, max(np.exp(-r * tau) - np.exp(x_min - q * tau), 0.0)])
+    upper = np.array([max(np.exp(x_max - q * tau) - np.exp(-r * tau), 0.0), 0.0])
+    return lower, upper
+
+
+def _theta_step(u, dt, theta, coefficients, x_min, x_max, tau, r, q):
+    """
+    One theta-scheme step (theta = 0.5 is Crank-Nicolson, 1 is implicit Euler) of the scaled
+    Black-Scholes PDE for the (grid, 2) array u holding call and put values.
+    """
+    sub, diag, sup = coefficients
+    lower, upper = _boundaries(x_min, x_max, tau, r, q)
+
+    rhs = u[1:-1] + (1.0 - theta) * dt * (sub * u[:-2] + diag * u[1:-1] + sup * u[2:])
+    rhs[0] += theta * dt * sub * lower
+    rhs[-1] += theta * dt * sup * upper
+
+    size = u.shape[0] - 2
+    banded = np.empty((3, size))
+    banded[0] = -theta * dt * sup
+    banded[1] = 1.0 - theta * dt * diag
+    banded[2] = -theta * dt * sub
+
+    new = np.empty_like(u)
+    new[0] = lower
+    new[-1] = upper
+    new[1:-1] = solve_banded((1, 1), banded, rhs, overwrite_b=True, check_finite=False)
+    return new
+
+
+def _solve_expiry(log_moneyness, sigma, r, T, q, time_grid, stock_grid, width, rannacher_steps):
+    """
+    Solve the Black-Scholes PDE once in log-moneyness x = ln(S / K) for scaled prices u = V / K,
+    for both calls and puts. Under BSM, V(S, K) = K u(ln(S / K)), so one solve prices every strike
+    sharing the same expiry, volatility and rates.
+
+    Returns:
+        tuple: (grid, u at expiry tau = T, u one time step earlier, dt), u arrays of shape (grid, 2)
+    """
+    std_dev = sigma * np.sqrt(T)
+    x_min = log_moneyness.min() - width * std_dev
+    x_max = log_moneyness.max() + width * std_dev
+    grid = np.linspace(x_min, x_max, stock_grid)
+    h = grid[1] - grid[0]
+
+    alpha = 0.5 * sigma ** 2
+    beta = r - q - alpha
+    coefficients = (alpha / h ** 2 - beta / (2.0 * h), -2.0 * alpha / h ** 2 - r, alpha / h ** 2 + beta / (2.0 * h))
+
+    u = np.column_stack((np.maximum(np.exp(grid) - 1.0, 0.0), np.maximum(1.0 - np.exp(grid), 0.0)))
+    dt = T / time_grid
+    tau = 0.0
+    previous = u
+    for step in range(time_grid):
+        previous = u
+        if step < rannacher_steps:
+            # Rannacher start-up: two implicit half steps damp the payoff kink that Crank-Nicolson would ring on
+            for _ in range(2):
+                tau += 0.5 * dt
+                u = _theta_step(u, 0.5 * dt, 1.0, coefficients, x_min, x_max, tau, r, q)
+        else:
+            tau += dt
+            u = _theta_step(u, dt, 0.5, coefficients, x_min, x_max, tau, r, q)
+    return grid, u, previous, dt
+
+
+def fd_chain_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type,
+                   time_grid=100, stock_grid=200, width=6.0, rannacher_steps=2, greeks=False):
+    """
+    Finite difference prices of European options with one PDE solve per expiry
+
+    Options are grouped by (time to expiry, sigma, rf_rate, div). Each group is solved once in
+    log-moneyness with Crank-Nicolson and every strike is read off the same grid with a cubic
+    spline, so a 60-strike expiry costs roughly one single-option solve. Options with their own
+    volatility (a smile) each form a group of their own.
+
+    Parameters:
+    -----------
+    underlying, strike, sigma, rf_rate, time_to_expiry, div : array-like
+        Black-Scholes-Merton inputs, time in years, broadcast together
+    option_type : scalar or array-like
+        Call/put flags, see black_scholes.is_call
+    time_grid : int, default 100
+        Number of time steps
+    stock_grid : int, default 200
+        Number of log-moneyness grid points
+    width : float, default 6.0
+        Grid half-width beyond the chain's moneyness range, in standard deviations sigma * sqrt(T)
+    rannacher_steps : int, default 2
+        Number of initial Crank-Nicolson steps replaced by two implicit half steps
+    greeks : bool, default False
+        Also return delta, gamma and theta (per year) read off the same grid
+
+    Returns:
+    --------
+    numpy.ndarray or dict
+        Prices, or a dict of 'price', 'delta', 'gamma' and 'theta' arrays when greeks=True
+    """
+    S, K, sigma, r, T, q = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in
+                                                 (underlying, strike, sigma, rf_rate, time_to_expiry, div)))
+    shape = S.shape
+    call = np.broadcast_to(is_call(option_type), shape).ravel()
+    S, K, sigma, r, T, q = (x.ravel() for x in (S, K, sigma, r, T, q))
+
+    results = {name: np.zeros(S.size) for name in ('price', 'delta', 'gamma', 'theta')}
+    column = np.where(call, 0, 1)
+    log_moneyness = np.log(S / K)
+
+    # Expired and zero-volatility options take the closed-form limit
+    results['price'] = bsm_price(S, K, sigma, r, T, q, call)
+    live = np.flatnonzero((T > 0.0) & (sigma > 0.0))
+    keys, groups = np.unique(np.column_stack((T[live], sigma[live], r[live], q[live])), axis=0, return_inverse=True)
+    groups = groups.ravel()
+
+    for g, (t, vol, rate, yld) in enumerate(keys):
+        rows = live[groups == g]
+        grid, u, previous, dt = _solve_expiry(log_moneyness[rows], vol, rate, t, yld,
+                                              time_grid, stock_grid, width, rannacher_steps)
+        x = log_moneyness[rows]
+        col = column[rows]
+        spline = CubicSpline(grid, u, axis=0)
+        value = spline(x)[np.arange(rows.size), col]
+        results['price'][rows] = K[rows] * value
+        if greeks:
+            first = spline(x, 1)[np.arange(rows.size), col]
+            second = spline(x, 2)[np.arange(rows.size), col]
+            earlier = CubicSpline(grid, previous, axis=0)(x)[np.arange(rows.size), col]
+            results['delta'][rows] = K[rows] * first / S[rows]
+            results['gamma'][rows] = K[rows] * (second - first) / S[rows] ** 2
+            results['theta'][rows] = -K[rows] * (value - earlier) / dt
+
+    if greeks:
+        return {name: values.reshape(shape) for name, values in results.items()}
+    return results['price'].reshape(shape)
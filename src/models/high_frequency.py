@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+# Parzen kernel bandwidth constant c* of Barndorff-Nielsen, Hansen, Lunde and Shephard (2009)
+_PARZEN_CONSTANT = (12.0 ** 2 / 0.269) ** 0.2
+
+ESTIMATOR_COLUMNS = ('rv', 'bv', 'tsrv', 'msrv', 'rk', 'jump')
+
+
+def _parzen(x):
+    x = np.abs(x)
+    return np.where(x <= 0.5, 1.0 - 6.0 * x ** 2 + 6.0 * x ** 3, np.where(x <= 1.0, 2.0 * (1.0 - x) ** 3, 0.0))
+
+
+class TickVariance:
+    """
+    Noise-robust integrated variance estimators over a stream of tick prices
+
+    Ticks are added in chunks of any size with update(). Each chunk only touches the sufficient
+    statistics below, plus the last few log prices carried over from the previous chunk, so a
+    session of any length is processed in O(chunk) memory:
+
+    - realized variance and autocovariances of tick returns up to kernel_lags (realized kernel)
+    - sum of products of adjacent absolute returns (bipower variation)
+    - subsampled realized variances at scales 1..msrv_scales and tsrv_scale (two- and multi-scale RV)
+
+    Parameters:
+    -----------
+    tsrv_scale : int, default 300
+        Slow time scale K of the two-scale estimator, in ticks
+    msrv_scales : int, default 20
+        Number of scales M of the multi-scale estimator
+    kernel_lags : int, default 100
+        Largest realized kernel bandwidth, the data-driven bandwidth is capped at this value
+    """
+    def __init__(self, tsrv_scale=300, msrv_scales=20, kernel_lags=100):
+        if msrv_scales < 2:
+            raise ValueError(f"Multi-scale RV needs at least 2 scales, got {msrv_scales}")
+        self.tsrv_scale = tsrv_scale
+        self.msrv_scales = msrv_scales
+        self.kernel_lags = kernel_lags
+        self.scales = np.unique(np.r_[np.arange(1, msrv_scales + 1), tsrv_scale])
+        self.carry_size = int(max(self.scales.max(), kernel_lags + 1))
+        self.reset()
+
+    def reset(self):
+        self.carry = np.empty(0)
+        self.ticks = 0
+        self.autocovariances = np.zeros(self.kernel_lags + 1)
+        self.bipower = 0.0
+        self.subsampled = np.zeros(self.scales.size)
+
+    def update(self, prices):
+        """
+        Add a chunk of tick prices in time order. Non-positive and NaN prices are skipped.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        prices = prices[np.isfinite(prices) & (prices > 0.0)]
+        if prices.size == 0:
+            return self
+        start = self.carry.size
+        log_prices = np.concatenate((self.carry, np.log(prices)))
+        returns = np.diff(log_prices)
+        # Returns ending at the new prices, each with all the history it needs in the carried prices
+        first = max(start - 1, 0)
+
+        for h in range(min(self.kernel_lags, returns.size - 1) + 1):
+            lo = max(first, h)
+            self.autocovariances[h] += np.dot(returns[lo:], returns[lo - h:returns.size - h])
+        lo = max(first, 1)
+        self.bipower += np.dot(np.abs(returns[lo:]), np.abs(returns[lo - 1:-1]))
+        for j, scale in enumerate(self.scales):
+            lo = max(start, scale)
+            if lo < log_prices.size:
+                differences = log_prices[lo:] - log_prices[lo - scale:log_prices.size - scale]
+                self.subsampled[j] += np.dot(differences, differences)
+
+        self.ticks += prices.size
+        self.carry = log_prices[-self.carry_size:]
+        return self
+
+    @property
+    def returns(self):
+        return max(self.ticks - 1, 0)
+
+    def bandwidth(self, integrated_variance=None):
+        """
+        Realized kernel bandwidth H = c* xi^(4/5) n^(3/5), with the noise-to-signal ratio xi^2 estimated
+        from the noise variance RV / (2n) and the integrated variance (two-scale RV by default).
+        """
+        n = self.returns
+        if integrated_variance is None:
+            integrated_variance = self.tsrv()
+        rv = self.autocovariances[0]
+        if not integrated_variance > 0.0:
+            integrated_variance = rv
+        if n == 0 or rv == 0.0:
+            return 0
+        xi = np.sqrt(rv / (2.0 * n) / integrated_variance)
+        return int(min(np.ceil(_PARZEN_CONSTANT * xi ** 0.8 * n ** 0.6), self.kernel_lags, n - 1))
+
+    def rv(self):
+        return self.autocovariances[0] if self.returns else np.nan
+
+    def bv(self):
+        n = self.returns
+        if n < 2:
+            return np.nan
+        return 0.5 * np.pi * n / (n - 1) * self.bipower
+
+    def _subsampled(self, scale):
+        return self.subsampled[np.searchsorted(self.scales, scale)] / scale
+
+    def tsrv(self):
+        """
+        Two-scale RV of Zhang, Mykland and Ait-Sahalia (2005), with the small-sample adjustment.
+        """
+        n, K = self.returns, self.tsrv_scale
+        n_bar = (n - K + 1) / K
+        if n_bar <= 0 or n_bar >= n:
+            return np.nan
+        return (self._subsampled(K) - n_bar / n * self.rv()) / (1.0 - n_bar / n)
+
+    def msrv(self):
+        """
+        Multi-scale RV of Zhang (2006): weighted average of subsampled RVs at scales 1..M whose weights
+        sum to one and cancel the noise bias.
+        """
+        M = self.msrv_scales
+        if self.returns <= M:
+            return np.nan
+        i = np.arange(1, M + 1)
+        weights = 12.0 * i * (i - 0.5 * (M + 1)) / (M * (M ** 2 - 1))
+        return float(np.dot(weights, [self._subsampled(scale) for scale in i]))
+
+    def rk(self, bandwidth=None):
+        """
+        Realized kernel with the Parzen weight function (Barndorff-Nielsen et al., 2008), non-negative by construction.
+        """
+        if self.returns == 0:
+            return np.nan
+        H = self.bandwidth() if bandwidth is None else min(bandwidth, self.kernel_lags)
+        h = np.arange(1, H + 1)
+        return self.autocovariances[0] + 2.0 * np.dot(_parzen(h / (H + 1.0)), self.autocovariances[1:H + 1])
+
+    def estimates(self, bandwidth=None):
+        """
+        All estimators as a dict of integrated variances over the ticks seen so far. 'jump' is the jump variation
+        max(RV - BV, 0) separating jumps from the continuous part.
+        """
+        rv, bv = self.rv(), self.bv()
+        return {
+            'rv': rv,
+            'bv': bv,
+            'tsrv': self.tsrv(),
+            'msrv': self.msrv(),
+            'rk': self.rk(bandwidth),
+            'jump': max(rv - bv, 0.0) if np.isfinite(bv) else np.nan,
+        }
+
+
+def read_tick_chunks(path, columns=None, chunksize=1_000_000):
+    """
+    Iterate over a CSV or Parquet tick file in DataFrame chunks, never loading the whole file
+
+    Parameters:
+    -----------
+    path : str
+        CSV file, or Parquet file (.parquet, needs pyarrow)
+    columns : list of str, optional
+        Columns to read
+    chunksize : int, default 1,000,000
+        Rows per chunk
+
+    Returns:
+    --------
+    iterator of pandas.DataFrame
+    """
+    if str(path).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def realized_measures(chunks, time_col='timestamp', price_col='price', session='1D', time_unit='ms',
+                      scaling=np.sqrt(365), tsrv_scale=300, msrv_scales=20, kernel_lags=100):
+    """
+    Calculate noise-robust realized volatilities per session from chunks of tick data
+
+    Chunks must be in time order (e.g. from read_tick_chunks). Each chunk is split at session
+    boundaries, and a session spanning several chunks is accumulated across them by TickVariance.
+
+    Parameters:
+    -----------
+    chunks : iterable of pandas.DataFrame
+        Tick data with time and price columns
+    time_col : str, default 'timestamp'
+        Name of the time column, datetimes or epoch numbers in time_unit (Deribit uses milliseconds)
+    price_col : str, default 'price'
+        Name of the trade price column
+    session : str, default '1D'
+        Session length as a pandas frequency
+    time_unit : str, default 'ms'
+        Unit of numeric timestamps
+    scaling : float, default sqrt(365)
+        Annualization factor for daily sessions of a market that trades every day
+    tsrv_scale, msrv_scales, kernel_lags : int
+        See TickVariance
+
+    Returns:
+    --------
+    pandas.DataFrame
+        One row per session with annualized volatilities (NaN where an estimate is negative or undefined)
+        for each of ESTIMATOR_COLUMNS, suffixed '_vol', and the number of ticks
+    """
+    rows = {}
+    current, accumulator = None, TickVariance(tsrv_scale, msrv_scales, kernel_lags)
+
+    def finish():
+        if current is not None and accumulator.ticks:
+            rows[current] = {**accumulator.estimates(), 'ticks': accumulator.ticks}
+
+    for chunk in chunks:
+        times = chunk[time_col]
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            times = pd.to_datetime(times, unit=time_unit)
+        labels = pd.DatetimeIndex(times).floor(session)
+        prices = np.asarray(chunk[price_col], dtype=np.float64)
+        # Positions where the session changes inside the chunk
+        breaks = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+        for lo, hi in zip(np.r_[0, breaks], np.r_[breaks, len(labels)]):
+            if lo == hi:
+                continue
+            if labels[lo] != current:
+                finish()
+                current = labels[lo]
+                accumulator.reset()
+            accumulator.update(prices[lo:hi])
+    finish()
+
+    variances = pd.DataFrame.from_dict(rows, orient='index', columns=list(ESTIMATOR_COLUMNS) + ['ticks'])
+    result = pd.DataFrame(index=variances.index)
+    for name in ESTIMATOR_COLUMNS:
+        values = variances[name].astype(np.float64)
+        result[f'{name}_vol'] = np.sqrt(values.where(values >= 0.0)) * scaling
+    result['ticks'] = variances['ticks']
+    return result
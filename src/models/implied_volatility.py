@@ -0,0 +1,119 @@
+import numpy as np
+from scipy.special import ndtr
+
+from .black_scholes import is_call
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+_MAX_STD_DEV = 20.0
+
+
+def _initial_guess(x, c):
+    """
+    Corrado-Miller rational approximation of s = sigma * sqrt(T) from the normalized call price,
+    clamped at zero where the square root is undefined.
+    """
+    strike = np.exp(-x)
+    half_intrinsic = 0.5 * (1.0 - strike)
+    excess = c - half_intrinsic
+    root = np.sqrt(np.maximum(excess ** 2 - (1.0 - strike) ** 2 / np.pi, 0.0))
+    return _SQRT_2PI / (1.0 + strike) * (excess + root)
+
+
+def implied_volatility(price, forward, strike, time_to_expiry, option_type, rf_rate=0.0,
+                       price_in_underlying=False, tol=1e-12, max_iter=50):
+    """
+    Vectorized Black implied volatility for a whole chain
+
+    Prices are normalized to an undiscounted out-of-the-money call in units of the forward
+    (in-the-money options go through put-call symmetry). A Corrado-Miller rational guess is then
+    refined with third-order Householder steps on all rows at once. Each row keeps a bracket, and
+    steps that leave it fall back to bisection. Rows are masked out once converged.
+
+    Parameters:
+    -----------
+    price : array-like
+        Option prices. In USD unless price_in_underlying is set
+    forward : array-like
+        Forward price of the underlying for each option's expiry (Deribit's underlying_price)
+    strike : array-like
+        Strike price
+    time_to_expiry : array-like
+        Time to expiry in years
+    option_type : scalar or array-like
+        Call/put flags, see black_scholes.is_call
+    rf_rate : array-like, default 0.0
+        Continuously compounded rate used to discount the premium
+    price_in_underlying : bool, default False
+        Prices are quoted in units of the underlying, like Deribit's BTC-denominated mark prices,
+        and are converted to USD with price * forward
+    tol : float, default 1e-12
+        Convergence tolerance on the normalized price
+    max_iter : int, default 50
+        Maximum number of iterations
+
+    Returns:
+    --------
+    numpy.ndarray
+        Implied volatilities. NaN where no volatility reproduces the price
+        (below intrinsic, above the forward, or invalid inputs) and 0 at exactly intrinsic value.
+    """
+    price, F, K, T, r = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in
+                                              (price, forward, strike, time_to_expiry, rf_rate)))
+    shape = price.shape
+    call = np.broadcast_to(is_call(option_type), shape).ravel()
+    price, F, K, T, r = (v.ravel() for v in (price, F, K, T, r))
+    if price_in_underlying:
+        price = price * F
+
+    x = np.log(F / K)
+    c = price * np.exp(r * T) / F
+    # Puts to calls by parity, then in-the-money calls to out-of-the-money calls by put-call symmetry
+    c = np.where(call, c, c + 1.0 - np.exp(-x))
+    itm = x > 0.0
+    c = np.where(itm, (c - (1.0 - np.exp(-x))) * np.exp(x), c)
+    x = -np.abs(x)
+    intrinsic = np.isfinite(x) & (T > 0.0) & (c == 0.0)
+
+    valid = np.isfinite(c) & np.isfinite(x) & (T > 0.0) & (c > 0.0) & (c < 1.0)
+    s = np.full_like(c, np.nan)
+
+    # Iterate on the compressed set of unconverged rows only
+    rows = np.flatnonzero(valid)
+    x, c = x[rows], c[rows]
+    strike_ratio = np.exp(-x)
+    guess = _initial_guess(x, c)
+    lower = np.zeros_like(c)
+    upper = np.full_like(c, _MAX_STD_DEV)
+    guess = np.where((guess <= lower) | (guess >= upper) | ~np.isfinite(guess), 1.0, guess)
+
+    for _ in range(max_iter):
+        if rows.size == 0:
+            break
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            d1 = x / guess + 0.5 * guess
+            d2 = d1 - guess
+            f = ndtr(d1) - strike_ratio * ndtr(d2) - c
+            lower = np.where(f < 0.0, guess, lower)
+            upper = np.where(f > 0.0, guess, upper)
+
+            # Householder step: Newton step corrected with vega's first and second derivatives in s
+            newton = -f * _SQRT_2PI * np.exp(0.5 * d1 * d1)
+            h2 = d1 * d2 / guess
+            h3 = h2 * h2 - 3.0 * x * x / guess ** 4 - 0.25
+            step = newton * (1.0 + 0.5 * h2 * newton) / (1.0 + h2 * newton + h3 * newton * newton / 6.0)
+            candidate = guess + step
+
+        converged = np.abs(f) <= tol
+        bisect = ~np.isfinite(candidate) | (candidate <= lower) | (candidate >= upper)
+        candidate = np.where(bisect, 0.5 * (lower + upper), candidate)
+        guess = np.where(converged, guess, candidate)
+        s[rows] = guess
+
+        active = ~converged & (np.abs(step) > tol * np.maximum(guess, 1.0))
+        rows, x, c, strike_ratio, guess, lower, upper = (
+            v[active] for v in (rows, x, c, strike_ratio, guess, lower, upper))
+
+    iv = s / np.sqrt(T)
+    # At exactly intrinsic value the only solution is zero volatility
+    iv[intrinsic] = 0.0
+    return iv.reshape(shape)
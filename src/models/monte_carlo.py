@@ -0,0 +1,128 @@
+import numpy as np
+
+from .black_scholes import is_call
+
+# Default number of (option, draw) elements per chunk: each float64 temporary then takes about 16 MB
+CHUNK_ELEMENTS = 2_000_000
+
+
+def _merge_moments(stats, count, means, comoments):
+    """
+    Merge a chunk's means and centered (co)moments into running totals (Chan et al. parallel update).
+    stats holds 'count', 'mean_y', 'mean_x', 'm_yy', 'm_xx', 'm_xy'.
+    """
+    if stats['count'] == 0:
+        stats['count'] = count
+        stats['mean_y'], stats['mean_x'] = means
+        stats['m_yy'], stats['m_xx'], stats['m_xy'] = comoments
+        return
+
+    total = stats['count'] + count
+    delta_y = means[0] - stats['mean_y']
+    delta_x = means[1] - stats['mean_x']
+    weight = stats['count'] * count / total
+
+    stats['m_yy'] = stats['m_yy'] + comoments[0] + delta_y * delta_y * weight
+    stats['m_xx'] = stats['m_xx'] + comoments[1] + delta_x * delta_x * weight
+    stats['m_xy'] = stats['m_xy'] + comoments[2] + delta_x * delta_y * weight
+    stats['mean_y'] = stats['mean_y'] + delta_y * count / total
+    stats['mean_x'] = stats['mean_x'] + delta_x * count / total
+    stats['count'] = total
+
+
+def mc_european_price(underlying, strike, sigma, rf_rate, time_to_expiry, div, option_type,
+                      num_paths=100_000, antithetic=True, control_variate=True,
+                      chunk_size=None, seed=42):
+    """
+    Vectorized Monte Carlo price of European options under Black-Scholes-Merton
+
+    European payoffs only depend on the terminal price, so S_T is sampled exactly from the
+    lognormal distribution in a single step. All options share the same normal draws (common
+    random numbers), which keeps errors smooth across a chain. Paths are processed in chunks of
+    about CHUNK_ELEMENTS draws across all options, so memory stays bounded whatever num_paths and
+    the chain size are. Chunking does not change the draws, only the summation order.
+
+    Parameters:
+    -----------
+    underlying, strike, sigma, rf_rate, time_to_expiry, div : array-like
+        Black-Scholes-Merton inputs, time in years, broadcast together
+    option_type : scalar or array-like
+        Call/put flags, see black_scholes.is_call
+    num_paths : int, default 100_000
+        Number of terminal prices sampled per option (rounded up to an even number with antithetics)
+    antithetic : bool, default True
+        Pair every draw Z with -Z
+    control_variate : bool, default True
+        Use the discounted terminal price, whose expectation S * exp(-q * T) is known analytically,
+        as a control variate with the optimal regression coefficient
+    chunk_size : int, optional
+        Number of draws generated per chunk, defaults to CHUNK_ELEMENTS divided by the number of options
+    seed : int, default 42
+        Seed of the NumPy random generator
+
+    Returns:
+    --------
+    tuple of numpy.ndarray
+        (prices, standard errors)
+    """
+    S, K, sigma, r, T, q = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in
+                                                 (underlying, strike, sigma, rf_rate, time_to_expiry, div)))
+    shape = S.shape
+    S, K, sigma, r, T, q = (x.reshape(-1, 1) for x in (S, K, sigma, r, T, q))
+    sign = np.where(np.broadcast_to(is_call(option_type), shape).reshape(-1, 1), 1.0, -1.0)
+
+    discount = np.exp(-r * T)
+    drift = (r - q - 0.5 * sigma ** 2) * T
+    diffusion = sigma * np.sqrt(T)
+    expected_control = S * np.exp(-q * T)
+
+    rng = np.random.default_rng(seed)
+    draws = num_paths // 2 + num_paths % 2 if antithetic else num_paths
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_ELEMENTS // max(S.shape[0], 1))
+    stats = {'count': 0}
+
+    def discounted(z):
+        terminal = S * np.exp(drift + diffusion * z)
+        return discount * np.maximum(sign * (terminal - K), 0.0), discount * terminal
+
+    remaining = draws
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        remaining -= size
+        z = rng.standard_normal(size)
+
+        payoff, control = discounted(z)
+        if antithetic:
+            payoff_anti, control_anti = discounted(-z)
+            payoff = 0.5 * (payoff + payoff_anti)
+            control = 0.5 * (control + control_anti)
+
+        # Center the control on its known mean before accumulating, for numerical stability
+        control = control - expected_control
+        mean_y = payoff.mean(axis=1, keepdims=True)
+        mean_x = control.mean(axis=1, keepdims=True)
+        centered_y = payoff - mean_y
+        centered_x = control - mean_x
+        _merge_moments(stats, size, (mean_y, mean_x), (
+            (centered_y * centered_y).sum(axis=1, keepdims=True),
+            (centered_x * centered_x).sum(axis=1, keepdims=True),
+            (centered_x * centered_y).sum(axis=1, keepdims=True),
+        ))
+
+    n = stats['count']
+    var_y = stats['m_yy'] / (n - 1)
+    if control_variate:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = np.where(stats['m_xx'] > 0.0, stats['m_xy'] / stats['m_xx'], 0.0)
+        price = stats['mean_y'] - beta * stats['mean_x']
+        variance = np.maximum(var_y - beta * stats['m_xy'] / (n - 1), 0.0)
+    else:
+        price = stats['mean_y']
+        variance = var_y
+
+    std_error = np.sqrt(variance / n)
+    # As in QuantLib, options expiring on the evaluation date are worth nothing
+    price = np.where(T > 0.0, price, 0.0)
+    std_error = np.where(T > 0.0, std_error, 0.0)
+    return price.reshape(shape), std_error.reshape(shape)
@@ -1,6 +1,9 @@
 import numpy as np
 import pandas as pd
 
+# Column names of calculate_all_volatilities, in order
+ESTIMATOR_COLUMNS = ('simple_vol', 'parkinson_vol', 'garman_klass_vol', 'rogers_satchell_vol', 'yang_zhang_vol')
+
 def simple_historical_volatility(df, window=20, scaling=np.sqrt(252), log_return_col='log_return'):
     """
     Calculate Simple Historical Volatility (Close-to-Close)
@@ -145,18 +148,17 @@ def yang_zhang_volatility(df, window=20, scaling=np.sqrt(252), k=0.34,
     pandas.Series
         Series with calculated Yang-Zhang volatility
     """
-    # Calculate overnight returns (close to next open)
-    df_copy = df.copy()
-    df_copy['overnight_return'] = np.log(df_copy[open_col] / df_copy[close_col].shift(1))
+    # Calculate overnight returns (close to next open), without copying the whole DataFrame
+    overnight_return = np.log(df[open_col] / df[close_col].shift(1))
     
     # Calculate open-to-close returns
-    df_copy['open_close_return'] = np.log(df_copy[close_col] / df_copy[open_col])
+    open_close_return = np.log(df[close_col] / df[open_col])
     
     # Calculate overnight volatility component
-    overnight_vol = df_copy['overnight_return'].rolling(window=window).var()
+    overnight_vol = overnight_return.rolling(window=window).var()
     
     # Calculate open-to-close volatility component
-    open_close_vol = df_copy['open_close_return'].rolling(window=window).var()
+    open_close_vol = open_close_return.rolling(window=window).var()
     
     # Calculate Rogers-Satchell volatility for the intraday part
     rs_vol = rogers_satchell_volatility(df, window=window, scaling=1.0,
@@ -170,6 +172,160 @@ def yang_zhang_volatility(df, window=20, scaling=np.sqrt(252), k=0.34,
     return np.sqrt(yang_zhang) * scaling
 
 
+def _block_prefix_sums(values, block):
+    """
+    Exclusive prefix sums along the first axis (len(values) + 1 of them) restarted every `block` rows,
+    and the total of each block. Sums stay at the magnitude of one block, so window sums taken from
+    them keep full precision however long the series is.
+    """
+    n = values.shape[0]
+    blocks = n // block + 1
+    padded = np.zeros((blocks * block,) + values.shape[1:])
+    padded[:n] = values
+    padded = padded.reshape((blocks, block) + values.shape[1:])
+    inclusive = np.cumsum(padded, axis=1)
+    return (inclusive - padded).reshape((blocks * block,) + values.shape[1:])[:n + 1], inclusive[:, -1]
+
+
+def _rolling_windows(values, windows, statistic, out=None):
+    """
+    Rolling mean or variance (ddof=1) along the first axis for several windows from a single set of prefix sums.
+    Each series is centered on its mean and summed in blocks at least as long as the largest window, so
+    a window spans at most one block boundary and sums never grow with the length of the series.
+    Like pandas rolling(window), results are NaN until the window holds `window` non-NaN values.
+    
+    Returns:
+    --------
+    numpy.ndarray
+        Shape (len(windows), *values.shape), written into out when given
+    """
+    valid = ~np.isnan(values)
+    center = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+    centered = np.where(valid, values - center, 0.0)
+    block = max(max(windows), min(4096, values.shape[0] + 1))
+    sums, sum_totals = _block_prefix_sums(centered, block)
+    squares, square_totals = _block_prefix_sums(centered * centered, block)
+    counts = np.concatenate((np.zeros((1,) + values.shape[1:], dtype=np.int64), np.cumsum(valid, axis=0)))
+    
+    n = values.shape[0]
+    result = np.empty((len(windows),) + values.shape) if out is None else out
+    result[:] = np.nan
+    for j, window in enumerate(windows):
+        if window > n:
+            continue
+        total = sums[window:] - sums[:-window]
+        total_squares = squares[window:] - squares[:-window] if statistic == 'var' else None
+        # Windows straddling a block boundary add the total of the block they start in
+        for boundary in range(block, n + 1, block):
+            straddling = slice(max(boundary - window, 0), boundary)
+            total[straddling] += sum_totals[boundary // block - 1]
+            if total_squares is not None:
+                total_squares[straddling] += square_totals[boundary // block - 1]
+        
+        if statistic == 'mean':
+            stat = total / window + center
+        else:
+            stat = np.maximum(total_squares - total * total / window, 0.0) / (window - 1)
+        if not valid.all():
+            stat[(counts[window:] - counts[:-window]) < window] = np.nan
+        result[j, window - 1:] = stat
+    return result
+
+
+def _row_index(df, length):
+    """
+    Index of a DataFrame, or 0..length-1 for a dict of column arrays
+    """
+    return df.index if isinstance(df, (pd.DataFrame, pd.Series)) else pd.RangeIndex(length)
+
+
+def _fused_volatilities(open_, high, low, close, log_return, windows, scaling, k):
+    """
+    All five estimators for every window, rolling along the first axis of the price arrays.
+    log_return may be None to use close-to-close log returns.
+    
+    Returns:
+    --------
+    numpy.ndarray
+        Shape (5, len(windows), *close.shape), estimators ordered as ESTIMATOR_COLUMNS
+    """
+    previous_close = np.concatenate((np.full((1,) + close.shape[1:], np.nan), close[:-1]))
+    if log_return is None:
+        log_return = np.log(close / previous_close)
+    
+    log_high_low = np.log(high / low)
+    log_close_open = np.log(close / open_)
+    log_high = np.log(high / close) * np.log(high / open_)
+    log_low = np.log(low / close) * np.log(low / open_)
+    overnight = np.log(open_ / previous_close)
+    
+    # Estimator-major (5, windows, rows) so every rolling result is written contiguously
+    result = np.empty((len(ESTIMATOR_COLUMNS), len(windows)) + close.shape)
+    _rolling_windows(log_return, windows, 'var', out=result[0])
+    _rolling_windows(log_high_low ** 2 / (4.0 * np.log(2.0)), windows, 'mean', out=result[1])
+    _rolling_windows(0.5 * log_high_low ** 2 - (2 * np.log(2) - 1) * log_close_open ** 2, windows, 'mean', out=result[2])
+    rogers_satchell = _rolling_windows(log_high + log_low, windows, 'mean', out=result[3])
+    
+    # σ²_yz = σ²_overnight + k*σ²_open-close + (1-k)*σ²_RS
+    yang_zhang = _rolling_windows(overnight, windows, 'var', out=result[4])
+    yang_zhang += k * _rolling_windows(log_close_open, windows, 'var')
+    yang_zhang += (1 - k) * rogers_satchell
+    with np.errstate(invalid='ignore'):
+        np.sqrt(result, out=result)
+    result *= scaling
+    return result
+
+
+def fused_volatilities(df, windows=(5, 10, 20, 60, 120), scaling=np.sqrt(252), k=0.34,
+                       high_col='high', low_col='low', open_col='open', close_col='close',
+                       log_return_col='log_return', dtype=np.float64, as_frame=True):
+    """
+    Calculate all five volatility measures for many windows in one pass
+    
+    Each log ratio (high/low, close/open, overnight...) is computed once, and every rolling
+    mean or variance comes from one set of prefix sums shared by all windows, so each extra
+    window costs a few vector operations instead of a pandas rolling() per estimator.
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame or dict of arrays
+        DataFrame with OHLCV data, and log returns if log_return_col is present, or a dict of
+        column arrays such as MemoryMappedSeries.columns() (rows are then indexed 0..n-1)
+    windows : sequence of int, default (5, 10, 20, 60, 120)
+        Rolling windows
+    scaling : float, default sqrt(252)
+        Annualization factor
+    k : float, default 0.34
+        Yang-Zhang weighting parameter
+    high_col, low_col, open_col, close_col : str
+        Names of the respective price columns
+    log_return_col : str, default 'log_return'
+        Name of the log return column, computed from close prices when missing
+    dtype : numpy dtype, default float64
+        Output dtype, float32 halves memory on long histories
+    as_frame : bool, default True
+        Return a DataFrame with (estimator, window) MultiIndex columns instead of an array
+        
+    Returns:
+    --------
+    pandas.DataFrame or numpy.ndarray
+        Volatilities, or an array of shape (len(df), 5, len(windows)) with estimators ordered
+        as calculate_all_volatilities' columns (a transposed view, no copy is made)
+    """
+    windows = tuple(int(w) for w in windows)
+    open_, high, low, close = (np.asarray(df[col], dtype=np.float64) for col in (open_col, high_col, low_col, close_col))
+    log_return = np.asarray(df[log_return_col], dtype=np.float64) if log_return_col in df else None
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = _fused_volatilities(open_, high, low, close, log_return, windows, scaling, k)
+    result = result.astype(dtype, copy=False)
+    
+    if not as_frame:
+        return result.transpose(2, 0, 1)
+    columns = pd.MultiIndex.from_product([ESTIMATOR_COLUMNS, windows], names=['estimator', 'window'])
+    return pd.DataFrame(result.reshape(-1, close.shape[0]).T, index=_row_index(df, close.shape[0]),
+                        columns=columns, copy=False)
+
+
 def calculate_all_volatilities(df, window=20, scaling=np.sqrt(252),
                                high_col='high', low_col='low', 
                                open_col='open', close_col='close',
@@ -179,8 +335,8 @@ def calculate_all_volatilities(df, window=20, scaling=np.sqrt(252),
     
     Parameters:
     -----------
-    df : pandas.DataFrame
-        DataFrame with OHLCV data and log returns
+    df : pandas.DataFrame or dict of arrays
+        DataFrame with OHLCV data and log returns, or a dict of column arrays as in fused_volatilities
     window : int, default 20
         Rolling window for volatility calculation
     scaling, high_col, low_col, open_col, close_col, log_return_col:
@@ -191,25 +347,104 @@ def calculate_all_volatilities(df, window=20, scaling=np.sqrt(252),
     pandas.DataFrame
         DataFrame with all calculated volatility measures
     """
-    result = pd.DataFrame(index=df.index)
+    # One fused pass shares the log ratios between estimators, see fused_volatilities
+    result = fused_volatilities(df, windows=(window,), scaling=scaling,
+                                high_col=high_col, low_col=low_col, open_col=open_col, close_col=close_col,
+                                log_return_col=log_return_col, as_frame=False)
+    return pd.DataFrame(result[:, :, 0], index=_row_index(df, result.shape[0]), columns=list(ESTIMATOR_COLUMNS))
+
+
+def _panel_block(prices, log_return, windows, scaling, k, dtype):
+    """
+    Fused estimators for a (time, assets, 4) OHLC block, returned as (time, assets, 5, windows).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = _fused_volatilities(prices[..., 0], prices[..., 1], prices[..., 2], prices[..., 3],
+                                     log_return, windows, scaling, k)
+    return result.transpose(2, 3, 0, 1).astype(dtype, copy=False)
+
+
+def panel_volatilities(data, windows=(20,), scaling=np.sqrt(252), k=0.34, instrument_col='instrument',
+                       time_col=None, high_col='high', low_col='low', open_col='open', close_col='close',
+                       log_return_col='log_return', block_assets=256, dtype=np.float64):
+    """
+    Calculate all five volatility measures for a panel of instruments in one call
+    
+    Instruments are processed in blocks of block_assets, each block as one (time x assets) array
+    through the same fused pass as fused_volatilities, so memory is bounded by the block rather
+    than the panel. Every instrument rolls over its own bars: ragged histories are padded with NaN
+    and NaNs inside a history make the windows containing them NaN, as pandas rolling() does.
     
-    # Calculate each volatility measure
-    result['simple_vol'] = simple_historical_volatility(
-        df, window=window, scaling=scaling, log_return_col=log_return_col)
+    Parameters:
+    -----------
+    data : pandas.DataFrame or numpy.ndarray
+        Long format DataFrame with one row per (instrument, bar), or an array of shape
+        (time, assets, 4) with fields ordered open, high, low, close and NaN where an asset has no bar
+    windows : sequence of int, default (20,)
+        Rolling windows
+    scaling : float, default sqrt(252)
+        Annualization factor
+    k : float, default 0.34
+        Yang-Zhang weighting parameter
+    instrument_col : str, default 'instrument'
+        Name of the instrument key column (long format only)
+    time_col : str, optional
+        Name of the column to order each instrument's bars by, defaults to the row order (long format only)
+    high_col, low_col, open_col, close_col, log_return_col : str
+        Names of the respective columns (long format only), log returns are computed from
+        close prices per instrument when log_return_col is missing
+    block_assets : int, default 256
+        Instruments per block
+    dtype : numpy dtype, default float64
+        Output dtype
+        
+    Returns:
+    --------
+    pandas.DataFrame or numpy.ndarray
+        For long format, a DataFrame indexed like data with (estimator, window) MultiIndex columns.
+        For arrays, an array of shape (time, assets, 5, len(windows))
+    """
+    windows = tuple(int(w) for w in windows)
     
-    result['parkinson_vol'] = parkinson_volatility(
-        df, window=window, scaling=scaling, high_col=high_col, low_col=low_col)
+    if isinstance(data, np.ndarray):
+        if data.ndim != 3 or data.shape[2] != 4:
+            raise ValueError(f"Panel arrays must have shape (time, assets, 4), got {data.shape}")
+        result = np.empty(data.shape[:2] + (len(ESTIMATOR_COLUMNS), len(windows)), dtype=dtype)
+        for start in range(0, data.shape[1], block_assets):
+            block = np.asarray(data[:, start:start + block_assets], dtype=np.float64)
+            result[:, start:start + block_assets] = _panel_block(block, None, windows, scaling, k, dtype)
+        return result
     
-    result['garman_klass_vol'] = garman_klass_volatility(
-        df, window=window, scaling=scaling, 
-        high_col=high_col, low_col=low_col, open_col=open_col, close_col=close_col)
+    # Sort rows by instrument (then time), keeping the original order of each instrument's bars
+    codes, _ = pd.factorize(data[instrument_col])
+    order = (np.lexsort((np.asarray(data[time_col]), codes)) if time_col is not None
+             else np.argsort(codes, kind='stable'))
+    codes = codes[order]
+    lengths = np.bincount(codes[codes >= 0], minlength=codes.max() + 1 if codes.size else 0)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    # Rows with a missing instrument key sort first and are left out
+    skipped = np.count_nonzero(codes < 0)
+    position = np.arange(codes.size) - skipped - np.where(codes >= 0, starts[np.maximum(codes, 0)], 0)
     
-    result['rogers_satchell_vol'] = rogers_satchell_volatility(
-        df, window=window, scaling=scaling,
-        high_col=high_col, low_col=low_col, open_col=open_col, close_col=close_col)
+    fields = [np.asarray(data[col], dtype=np.float64)[order] for col in (open_col, high_col, low_col, close_col)]
+    log_return = np.asarray(data[log_return_col], dtype=np.float64)[order] if log_return_col in data else None
     
-    result['yang_zhang_vol'] = yang_zhang_volatility(
-        df, window=window, scaling=scaling,
-        high_col=high_col, low_col=low_col, open_col=open_col, close_col=close_col)
+    values = np.full((codes.size, len(ESTIMATOR_COLUMNS), len(windows)), np.nan, dtype=dtype)
+    for first in range(0, lengths.size, block_assets):
+        last = min(first + block_assets, lengths.size)
+        rows = slice(skipped + starts[first], skipped + starts[last - 1] + lengths[last - 1])
+        time_index, asset_index = position[rows], codes[rows] - first
+        
+        block = np.full((lengths[first:last].max(), last - first, 4), np.nan)
+        for f, field in enumerate(fields):
+            block[time_index, asset_index, f] = field[rows]
+        block_return = None
+        if log_return is not None:
+            block_return = np.full(block.shape[:2], np.nan)
+            block_return[time_index, asset_index] = log_return[rows]
+        values[rows] = _panel_block(block, block_return, windows, scaling, k, dtype)[time_index, asset_index]
     
-    return result
\ No newline at end of file
+    result = np.empty_like(values)
+    result[order] = values
+    columns = pd.MultiIndex.from_product([ESTIMATOR_COLUMNS, windows], names=['estimator', 'window'])
+    return pd.DataFrame(result.reshape(len(data), -1), index=data.index, columns=columns)
@@ -0,0 +1,257 @@
+import math
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+
+class RollingWindow:
+    """
+    Fixed-size window over a stream with O(1) running mean and variance
+
+    Values are kept in a ring buffer. Each push adds the new value and removes the oldest one with
+    Welford's update (and its inverse), so the mean and sum of squared deviations never need a pass
+    over the window. Like pandas rolling(window), statistics are NaN until the window holds `window`
+    non-NaN values. The running sums are recomputed from the buffer every `resync` pushes, which
+    bounds floating point drift on long streams at amortized O(1) cost.
+
+    Parameters:
+    -----------
+    window : int
+        Number of values in the window
+    resync : int, optional
+        Pushes between exact recomputations of the running sums, defaults to 100 * window, 0 to never recompute
+    """
+    def __init__(self, window, resync=None):
+        if window < 1:
+            raise ValueError(f"Window must be at least 1, got {window}")
+        self.window = window
+        self.resync = 100 * window if resync is None else resync
+        self.buffer = np.full(window, np.nan)
+        self.position = 0
+        self.count = 0
+        self.mean_value = 0.0
+        self.m2 = 0.0
+        self.pushes = 0
+
+    def push(self, value):
+        old = self.buffer[self.position]
+        self.buffer[self.position] = value
+        self.position = (self.position + 1) % self.window
+
+        if not math.isnan(old):
+            self.count -= 1
+            if self.count == 0:
+                self.mean_value = 0.0
+                self.m2 = 0.0
+            else:
+                delta = old - self.mean_value
+                self.mean_value -= delta / self.count
+                self.m2 -= delta * (old - self.mean_value)
+        if not math.isnan(value):
+            self.count += 1
+            delta = value - self.mean_value
+            self.mean_value += delta / self.count
+            self.m2 += delta * (value - self.mean_value)
+
+        self.pushes += 1
+        if self.resync and self.pushes % self.resync == 0:
+            self._recompute()
+
+    def _recompute(self):
+        values = self.buffer[~np.isnan(self.buffer)]
+        self.count = values.size
+        self.mean_value = float(values.mean()) if values.size else 0.0
+        self.m2 = float(((values - self.mean_value) ** 2).sum())
+
+    @property
+    def full(self):
+        return self.count == self.window
+
+    def mean(self):
+        return self.mean_value if self.full else np.nan
+
+    def var(self, ddof=1):
+        if not self.full or self.count <= ddof:
+            return np.nan
+        # Removing values can leave a tiny negative sum of squares from rounding
+        return max(self.m2, 0.0) / (self.count - ddof)
+
+
+def _log_ratio(numerator, denominator):
+    """
+    log(numerator / denominator), NaN for zero, negative or missing prices (e.g. the first bar's previous
+    close) instead of raising, like the NumPy batch estimators.
+    """
+    if numerator > 0.0 and denominator > 0.0:
+        return math.log(numerator / denominator)
+    return np.nan
+
+
+class StreamingVolatility(ABC):
+    """
+    Base class of the incremental realized volatility estimators
+
+    Estimators take one OHLC bar at a time through update() and return the current annualized
+    volatility in O(1). update_batch() feeds a DataFrame of bars and returns the same Series as the
+    corresponding function in realized_volatility.py, so the streaming and batch paths can be swapped.
+
+    Parameters:
+    -----------
+    window : int, default 20
+        Rolling window in bars
+    scaling : float, default sqrt(252)
+        Annualization factor
+    """
+    def __init__(self, window=20, scaling=np.sqrt(252)):
+        self.window = window
+        self.scaling = scaling
+        self.value = np.nan
+
+    @abstractmethod
+    def _variance(self, open_, high, low, close):
+        """
+        Add one bar and return the current variance per bar.
+        """
+
+    def update(self, open_, high, low, close):
+        """
+        Add one bar and return the current annualized volatility (NaN until the window is full).
+        """
+        with np.errstate(invalid='ignore'):
+            self.value = float(np.sqrt(self._variance(open_, high, low, close))) * self.scaling
+        return self.value
+
+    def update_batch(self, df, open_col='open', high_col='high', low_col='low', close_col='close'):
+        """
+        Add a batch of bars in order and return the volatility after each bar
+
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            DataFrame with OHLC columns
+        open_col, high_col, low_col, close_col : str
+            Names of the respective price columns
+
+        Returns:
+        --------
+        pandas.Series
+            Volatility after each bar, indexed like df
+        """
+        bars = zip(*(np.asarray(df[col], dtype=np.float64) for col in (open_col, high_col, low_col, close_col)))
+        values = np.array([self.update(*bar) for bar in bars], dtype=np.float64)
+        return pd.Series(values, index=df.index)
+
+
+class StreamingSimpleVolatility(StreamingVolatility):
+    """
+    Incremental simple_historical_volatility: standard deviation (ddof=1) of close-to-close log returns,
+    with log_return = log(close / previous close) and NaN for the first bar.
+    """
+    def __init__(self, window=20, scaling=np.sqrt(252)):
+        super().__init__(window, scaling)
+        self.returns = RollingWindow(window)
+        self.previous_close = np.nan
+
+    def _variance(self, open_, high, low, close):
+        self.returns.push(_log_ratio(close, self.previous_close))
+        self.previous_close = close
+        return self.returns.var()
+
+
+class StreamingParkinsonVolatility(StreamingVolatility):
+    """
+    Incremental parkinson_volatility: rolling mean of ln(high / low)^2 / (4 ln 2).
+    """
+    def __init__(self, window=20, scaling=np.sqrt(252)):
+        super().__init__(window, scaling)
+        self.terms = RollingWindow(window)
+
+    def _variance(self, open_, high, low, close):
+        self.terms.push(_log_ratio(high, low) ** 2)
+        return self.terms.mean() / (4.0 * math.log(2.0))
+
+
+class StreamingGarmanKlassVolatility(StreamingVolatility):
+    """
+    Incremental garman_klass_volatility: rolling mean of 0.5 ln(high / low)^2 - (2 ln 2 - 1) ln(close / open)^2.
+    """
+    def __init__(self, window=20, scaling=np.sqrt(252)):
+        super().__init__(window, scaling)
+        self.terms = RollingWindow(window)
+
+    def _variance(self, open_, high, low, close):
+        self.terms.push(0.5 * _log_ratio(high, low) ** 2 - (2.0 * math.log(2.0) - 1.0) * _log_ratio(close, open_) ** 2)
+        return self.terms.mean()
+
+
+def _rogers_satchell_term(open_, high, low, close):
+    return _log_ratio(high, close) * _log_ratio(high, open_) + _log_ratio(low, close) * _log_ratio(low, open_)
+
+
+class StreamingRogersSatchellVolatility(StreamingVolatility):
+    """
+    Incremental rogers_satchell_volatility: rolling mean of ln(H/C) ln(H/O) + ln(L/C) ln(L/O).
+    """
+    def __init__(self, window=20, scaling=np.sqrt(252)):
+        super().__init__(window, scaling)
+        self.terms = RollingWindow(window)
+
+    def _variance(self, open_, high, low, close):
+        self.terms.push(_rogers_satchell_term(open_, high, low, close))
+        return self.terms.mean()
+
+
+class StreamingYangZhangVolatility(StreamingVolatility):
+    """
+    Incremental yang_zhang_volatility: overnight variance + k * open-to-close variance + (1 - k) * Rogers-Satchell,
+    with both variances ddof=1 as in pandas rolling var().
+    """
+    def __init__(self, window=20, scaling=np.sqrt(252), k=0.34):
+        super().__init__(window, scaling)
+        self.k = k
+        self.overnight = RollingWindow(window)
+        self.open_close = RollingWindow(window)
+        self.rogers_satchell = RollingWindow(window)
+        self.previous_close = np.nan
+
+    def _variance(self, open_, high, low, close):
+        self.overnight.push(_log_ratio(open_, self.previous_close))
+        self.open_close.push(_log_ratio(close, open_))
+        self.rogers_satchell.push(_rogers_satchell_term(open_, high, low, close))
+        self.previous_close = close
+        return self.overnight.var() + self.k * self.open_close.var() + (1.0 - self.k) * self.rogers_satchell.mean()
+
+
+class StreamingVolatilities:
+    """
+    All five streaming estimators fed from the same bars, the incremental counterpart of calculate_all_volatilities
+
+    Parameters:
+    -----------
+    window : int, default 20
+        Rolling window in bars
+    scaling : float, default sqrt(252)
+        Annualization factor
+    """
+    def __init__(self, window=20, scaling=np.sqrt(252)):
+        self.estimators = {
+            'simple_vol': StreamingSimpleVolatility(window, scaling),
+            'parkinson_vol': StreamingParkinsonVolatility(window, scaling),
+            'garman_klass_vol': StreamingGarmanKlassVolatility(window, scaling),
+            'rogers_satchell_vol': StreamingRogersSatchellVolatility(window, scaling),
+            'yang_zhang_vol': StreamingYangZhangVolatility(window, scaling),
+        }
+
+    def update(self, open_, high, low, close):
+        """
+        Add one bar and return a dict of current volatilities keyed like calculate_all_volatilities' columns.
+        """
+        return {name: estimator.update(open_, high, low, close) for name, estimator in self.estimators.items()}
+
+    def update_batch(self, df, open_col='open', high_col='high', low_col='low', close_col='close'):
+        """
+        Add a batch of bars and return a DataFrame shaped like calculate_all_volatilities' result.
+        """
+        return pd.DataFrame({name: estimator.update_batch(df, open_col, high_col, low_col, close_col)
+                             for name, estimator in self.estimators.items()}, index=df.index)
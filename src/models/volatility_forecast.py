@@ -0,0 +1,254 @@
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+from .black_scholes import DAYS_PER_YEAR
+
+
+def garch_variance(returns, omega, alpha, beta, initial_variance=None):
+    """
+    Conditional variances of a GARCH(1,1) for a whole return series in one linear filter pass
+
+    sigma2[t] = omega + alpha * returns[t - 1] ** 2 + beta * sigma2[t - 1], so sigma2[t] is the
+    variance of returns[t] given the returns before it, and sigma2[len(returns)] the next bar's.
+    EWMA is the special case omega = 0, alpha = 1 - lambda, beta = lambda.
+
+    Parameters:
+    -----------
+    returns : array-like
+        Log returns per bar
+    omega, alpha, beta : float
+        GARCH(1,1) parameters
+    initial_variance : float, optional
+        sigma2[0], defaults to the sample variance of the returns
+
+    Returns:
+    --------
+    numpy.ndarray
+        len(returns) + 1 conditional variances
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if initial_variance is None:
+        initial_variance = returns.var()
+    shocks = np.empty(returns.size + 1)
+    shocks[0] = initial_variance
+    shocks[1:] = omega + alpha * returns ** 2
+    return lfilter([1.0], [1.0, -beta], shocks)
+
+
+def garch_negative_loglik(params, returns, initial_variance):
+    """
+    Gaussian negative log-likelihood of a GARCH(1,1) (without the constant) and its analytic gradient.
+    The derivatives of the conditional variances follow the same recursion as the variances themselves,
+    so the gradient costs three more linear filter passes.
+
+    Returns:
+    --------
+    tuple
+        (value, gradient with respect to (omega, alpha, beta))
+    """
+    omega, alpha, beta = params
+    sigma2 = garch_variance(returns, omega, alpha, beta, initial_variance)
+    previous, sigma2 = sigma2[:-2], sigma2[:-1]
+    squared = returns * returns
+    value = 0.5 * np.sum(np.log(sigma2) + squared / sigma2)
+
+    # d sigma2[t] / d theta = d shock[t] / d theta (+ sigma2[t - 1] for beta) + beta * d sigma2[t - 1] / d theta
+    inputs = np.zeros((3, returns.size))
+    inputs[0, 1:] = 1.0
+    inputs[1, 1:] = squared[:-1]
+    inputs[2, 1:] = previous
+    derivatives = lfilter([1.0], [1.0, -beta], inputs, axis=1)
+    gradient = derivatives @ (0.5 * (1.0 / sigma2 - squared / sigma2 ** 2))
+    return value, gradient
+
+
+def _term_variance(next_variance, long_run_variance, persistence, bars):
+    """
+    Expected total variance over the next `bars` bars, for arrays of horizons.
+    """
+    bars = np.asarray(bars, dtype=np.float64)
+    if persistence >= 1.0:
+        return next_variance * bars
+    decay = (1.0 - persistence ** bars) / (1.0 - persistence)
+    return long_run_variance * bars + (next_variance - long_run_variance) * decay
+
+
+class VolatilityForecast(ABC):
+    """
+    Base class of the conditional volatility forecasters
+
+    After fit() on a return history, update() rolls the next bar's variance forward in O(1) as each
+    new return arrives, and term_structure() turns it into annualized volatilities for option expiries.
+
+    Parameters:
+    -----------
+    scaling : float, default sqrt(252)
+        Annualization factor, the square root of the number of bars per year
+        (sqrt(365 * 1440) for 1-minute crypto bars)
+    """
+    def __init__(self, scaling=np.sqrt(252)):
+        self.scaling = scaling
+        self.variance = np.nan
+
+    @property
+    @abstractmethod
+    def params(self):
+        """
+        (omega, alpha, beta) of the variance recursion.
+        """
+
+    @property
+    def persistence(self):
+        _, alpha, beta = self.params
+        return alpha + beta
+
+    @property
+    def long_run_variance(self):
+        omega, _, _ = self.params
+        persistence = self.persistence
+        return omega / (1.0 - persistence) if persistence < 1.0 else np.nan
+
+    def filter(self, returns, initial_variance=None):
+        """
+        Run the variance recursion over returns and keep the next bar's variance for update() and forecasts.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Conditional annualized volatility of each return, and of the next bar as the last element
+        """
+        sigma2 = garch_variance(returns, *self.params, initial_variance)
+        self.variance = sigma2[-1]
+        return np.sqrt(sigma2) * self.scaling
+
+    def update(self, log_return):
+        """
+        Roll the next bar's variance forward with one new return and return it as an annualized volatility.
+        """
+        omega, alpha, beta = self.params
+        self.variance = omega + alpha * log_return * log_return + beta * self.variance
+        return np.sqrt(self.variance) * self.scaling
+
+    def term_structure(self, days_to_maturity):
+        """
+        Forecast volatilities to each expiry: the annualized square root of the expected average variance
+        between now and the expiry. days_to_maturity matches the pricers' column, so the result can be used
+        as their sigma directly.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Annualized volatilities, broadcast over days_to_maturity
+        """
+        days = np.asarray(days_to_maturity, dtype=np.float64)
+        bars = np.maximum(days / DAYS_PER_YEAR * self.scaling ** 2, 1.0)
+        total = _term_variance(self.variance, self.long_run_variance, self.persistence, bars)
+        return np.sqrt(total / bars) * self.scaling
+
+
+class EWMAVolatility(VolatilityForecast):
+    """
+    RiskMetrics exponentially weighted volatility, sigma2[t] = lam * sigma2[t - 1] + (1 - lam) * r[t - 1] ** 2.
+    Its forecasts are flat in the horizon.
+
+    Parameters:
+    -----------
+    lam : float, default 0.94
+        Decay factor
+    scaling : float, default sqrt(252)
+        Annualization factor
+    """
+    def __init__(self, lam=0.94, scaling=np.sqrt(252)):
+        super().__init__(scaling)
+        self.lam = lam
+
+    @property
+    def params(self):
+        return 0.0, 1.0 - self.lam, self.lam
+
+    def fit(self, returns, initial_variance=None):
+        self.filter(returns, initial_variance)
+        return self
+
+
+class GARCHVolatility(VolatilityForecast):
+    """
+    GARCH(1,1) volatility forecaster fitted by maximum likelihood
+
+    The likelihood is evaluated for the whole history with linear filters and minimized with its analytic
+    gradient. Returns are standardized before fitting so the optimizer works on O(1) parameters whatever the
+    bar size, and each fit starts from the previous solution, so refitting every minute on a rolling history
+    usually takes a few iterations.
+
+    Parameters:
+    -----------
+    scaling : float, default sqrt(252)
+        Annualization factor
+    max_persistence : float, default 0.9999
+        Upper bound of alpha + beta, keeping the process stationary
+    """
+    def __init__(self, scaling=np.sqrt(252), max_persistence=0.9999):
+        super().__init__(scaling)
+        self.max_persistence = max_persistence
+        self.omega = np.nan
+        self.alpha = 0.05
+        self.beta = 0.9
+        self.fitted = False
+        self.result = None
+
+    @property
+    def params(self):
+        return self.omega, self.alpha, self.beta
+
+    def fit(self, returns, warm_start=True):
+        """
+        Fit omega, alpha and beta to a return history and filter it, ready for update() and forecasts
+
+        Parameters:
+        -----------
+        returns : array-like
+            Log returns per bar
+        warm_start : bool, default True
+            Start from the previous fit's alpha and beta instead of (0.05, 0.9)
+
+        Returns:
+        --------
+        dict
+            Fitted parameters, log-likelihood and convergence statistics, also kept in self.result
+        """
+        start = time.perf_counter()
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[np.isfinite(returns)]
+        scale = returns.std()
+        if not scale > 0.0:
+            raise ValueError("Cannot fit a GARCH model to constant returns")
+        standardized = returns / scale
+
+        alpha, beta = (self.alpha, self.beta) if warm_start and self.fitted else (0.05, 0.9)
+        # Variance targeting starting point: omega from the unit sample variance of the standardized returns
+        x0 = np.array([max(1.0 - alpha - beta, 1e-6), alpha, beta])
+        solution = minimize(garch_negative_loglik, x0, args=(standardized, 1.0), jac=True, method='SLSQP',
+                            bounds=[(1e-12, None), (0.0, 1.0), (0.0, 1.0)],
+                            constraints=[{'type': 'ineq',
+                                          'fun': lambda x: self.max_persistence - x[1] - x[2],
+                                          'jac': lambda x: np.array([0.0, -1.0, -1.0])}])
+
+        omega, self.alpha, self.beta = solution.x
+        self.omega = omega * scale ** 2
+        self.fitted = True
+        self.filter(returns, scale ** 2)
+        self.result = {
+            'omega': self.omega,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'loglik': -(solution.fun + returns.size * np.log(scale)) - 0.5 * returns.size * np.log(2.0 * np.pi),
+            'iterations': solution.nit,
+            'success': bool(solution.success),
+            'message': solution.message,
+            'seconds': time.perf_counter() - start,
+        }
+        return self.result
@@ -0,0 +1,379 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+from .black_scholes import DAYS_PER_YEAR
+from .implied_volatility import implied_volatility
+
+SVI_PARAMS = ('a', 'b', 'rho', 'm', 'sigma')
+_MAX_RHO = 0.999
+_MIN_SIGMA = 1e-4
+
+
+def svi_total_variance(k, a, b, rho, m, sigma):
+    """
+    Raw SVI total implied variance w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2))
+
+    Parameters:
+    -----------
+    k : array-like
+        Log-moneyness log(K / F)
+    a, b, rho, m, sigma : array-like
+        Raw SVI parameters, broadcast against k
+
+    Returns:
+    --------
+    numpy.ndarray
+        Total implied variance sigma_BS^2 * T
+    """
+    y = k - m
+    return a + b * (rho * y + np.sqrt(y * y + sigma * sigma))
+
+
+def svi_derivatives(k, a, b, rho, m, sigma):
+    """
+    Raw SVI total variance and its first and second derivatives in k.
+    """
+    y = k - m
+    root = np.sqrt(y * y + sigma * sigma)
+    w = a + b * (rho * y + root)
+    return w, b * (rho + y / root), b * sigma * sigma / root ** 3
+
+
+def butterfly_density(k, w, dw, d2w):
+    """
+    Gatheral's g(k), proportional to the risk-neutral density implied by a total variance slice.
+    The slice is free of butterfly arbitrage where g(k) >= 0.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (1.0 - k * dw / (2.0 * w)) ** 2 - dw * dw / 4.0 * (1.0 / w + 0.25) + d2w / 2.0
+
+
+def ssvi_phi(theta, eta, gamma):
+    """
+    Power-law SSVI curvature phi(theta) = eta / (theta^gamma * (1 + theta)^(1 - gamma))
+    """
+    return eta / (theta ** gamma * (1.0 + theta) ** (1.0 - gamma))
+
+
+def ssvi_to_svi(theta, rho, phi):
+    """
+    Raw SVI parameters of SSVI slices w(k) = theta / 2 * (1 + rho * phi * k + sqrt((phi * k + rho)^2 + 1 - rho^2))
+
+    Returns:
+    --------
+    numpy.ndarray
+        (len(theta), 5) array of (a, b, rho, m, sigma)
+    """
+    theta, phi = np.broadcast_arrays(np.asarray(theta, dtype=np.float64), np.asarray(phi, dtype=np.float64))
+    rho = np.broadcast_to(rho, theta.shape)
+    return np.stack([theta / 2.0 * (1.0 - rho * rho), theta * phi / 2.0, rho, -rho / phi,
+                     np.sqrt(1.0 - rho * rho) / phi], axis=-1)
+
+
+def fit_svi_slice(k, w, weights=None, n_m=25, n_sigma=20):
+    """
+    Least-squares raw SVI fit of one expiry's total variances
+
+    For fixed (m, sigma) the total variance is linear in (a, b * rho, b), so a grid of (m, sigma)
+    candidates is solved at once through batched 3x3 normal equations. The best candidate that keeps
+    b >= 0, |rho| < 1 and a non-negative minimum variance then seeds a bounded least-squares refinement
+    of all five parameters.
+
+    Parameters:
+    -----------
+    k : array-like
+        Log-moneyness log(K / F)
+    w : array-like
+        Total implied variances sigma^2 * T
+    weights : array-like, optional
+        Residual weights, e.g. vegas or inverse bid-ask spreads
+    n_m, n_sigma : int, default 25, 20
+        Grid sizes of the linear stage
+
+    Returns:
+    --------
+    numpy.ndarray
+        (a, b, rho, m, sigma)
+    """
+    k = np.asarray(k, dtype=np.float64)
+    w = np.asarray(w, dtype=np.float64)
+    weights = np.ones_like(k) if weights is None else np.asarray(weights, dtype=np.float64)
+    span = max(k.max() - k.min(), 0.05)
+
+    m = np.linspace(k.min() - 0.25 * span, k.max() + 0.25 * span, n_m)
+    sigma = np.geomspace(0.01 * span, 2.0 * span, n_sigma)
+    m, sigma = (v.ravel() for v in np.meshgrid(m, sigma))
+    y = k[None, :] - m[:, None]
+    design = np.stack([np.ones_like(y), y, np.sqrt(y * y + sigma[:, None] ** 2)], axis=-1) * weights[None, :, None]
+    target = w * weights
+    normal = np.einsum('gni,gnj->gij', design, design) + 1e-12 * np.eye(3)
+    coef = np.linalg.solve(normal, np.einsum('gni,n->gi', design, target)[..., None])[..., 0]
+    sse = np.sum((np.einsum('gni,gi->gn', design, coef) - target) ** 2, axis=1)
+
+    a, c, b = coef.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = c / b
+        feasible = (b > 0.0) & (np.abs(rho) < _MAX_RHO) & (a + b * sigma * np.sqrt(1.0 - rho * rho) >= 0.0)
+    if feasible.any():
+        best = np.flatnonzero(feasible)[np.argmin(sse[feasible])]
+        x0 = np.array([a[best], b[best], rho[best], m[best], sigma[best]])
+    else:
+        x0 = np.array([max(w.min(), 1e-6), 0.1, 0.0, 0.0, 0.1 * span])
+
+    def residuals(x):
+        return (svi_total_variance(k, *x) - w) * weights
+
+    lower = [-np.inf, 0.0, -_MAX_RHO, -np.inf, _MIN_SIGMA]
+    upper = [np.inf, np.inf, _MAX_RHO, np.inf, np.inf]
+    return least_squares(residuals, np.clip(x0, lower, upper), bounds=(lower, upper), method='trf',
+                         x_scale='jac').x
+
+
+class IVSurface:
+    """
+    Implied volatility surface made of one SVI slice per expiry
+
+    Slices are fitted in log-moneyness k = log(K / F) on total variance w = sigma^2 * T, either as
+    independent raw SVI fits ('svi') or as one SSVI surface with a power-law curvature ('ssvi'), which is
+    free of butterfly arbitrage by construction (eta * (1 + |rho|) <= 2, gamma <= 1/2) and of calendar
+    arbitrage once the ATM total variances increase. SSVI slices are stored as their raw SVI equivalents,
+    so both models evaluate the same way.
+
+    Between expiries total variance is interpolated linearly in time at fixed log-moneyness, and
+    forwards log-linearly; before the first and after the last expiry the implied volatility of the
+    nearest slice is held constant. Evaluation gathers the two neighbouring slices' parameters per point,
+    so whole arrays of (K, T) are priced in a few vectorized passes.
+
+    Parameters:
+    -----------
+    model : str, default 'svi'
+        'svi' for independent raw SVI slices, 'ssvi' for a joint SSVI fit
+    """
+    def __init__(self, model='svi'):
+        if model not in ('svi', 'ssvi'):
+            raise ValueError(f"Unknown surface model {model}, expected 'svi' or 'ssvi'")
+        self.model = model
+        self.expiries = np.empty(0)
+        self.forwards = np.empty(0)
+        self.params = np.empty((0, 5))
+        self.ssvi_params = None
+        self.stats = None
+
+    def fit(self, strike, time_to_expiry, implied_vol, forward, weights=None, min_points=5):
+        """
+        Fit the slices to a chain snapshot's implied volatilities
+
+        Parameters:
+        -----------
+        strike, time_to_expiry, implied_vol, forward : array-like
+            One entry per option: strike, time to expiry in years, Black implied volatility and the
+            forward of its expiry (Deribit's underlying_price). Rows with missing volatilities are dropped
+        weights : array-like, optional
+            Residual weights per option
+        min_points : int, default 5
+            Expiries with fewer quotes are skipped
+
+        Returns:
+        --------
+        IVSurface
+            self, with per-expiry fit statistics in self.stats
+        """
+        start = time.perf_counter()
+        K, T, iv, F = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64)
+                                            for v in (strike, time_to_expiry, implied_vol, forward)))
+        W = np.ones_like(K) if weights is None else np.broadcast_to(np.asarray(weights, dtype=np.float64), K.shape)
+        K, T, iv, F, W = (v.ravel() for v in (K, T, iv, F, W))
+        valid = np.isfinite(K) & np.isfinite(T) & np.isfinite(iv) & np.isfinite(F) & (T > 0.0) & (iv > 0.0)
+        K, T, iv, F, W = K[valid], T[valid], iv[valid], F[valid], W[valid]
+
+        expiries, group = np.unique(T, return_inverse=True)
+        counts = np.bincount(group, minlength=expiries.size)
+        keep = counts >= min_points
+        if not keep.any():
+            raise ValueError(f"No expiry has at least {min_points} implied volatilities to fit")
+        forwards = np.bincount(group, weights=F, minlength=expiries.size) / np.maximum(counts, 1)
+        slices = [np.flatnonzero(group == i) for i in np.flatnonzero(keep)]
+        self.expiries, self.forwards = expiries[keep], forwards[keep]
+
+        k = np.log(K / F)
+        w = iv * iv * T
+        if self.model == 'svi':
+            self.params = np.array([fit_svi_slice(k[rows], w[rows], W[rows]) for rows in slices])
+        else:
+            self.params = self._fit_ssvi(k, w, W, slices)
+
+        errors = [np.sqrt(np.mean((self.implied_vol(K[rows], T[rows], F[rows]) - iv[rows]) ** 2)) for rows in slices]
+        self.stats = pd.DataFrame({'time_to_expiry': self.expiries, 'forward': self.forwards,
+                                   'points': counts[keep], 'rmse_iv': errors})
+        self.stats.attrs['seconds'] = time.perf_counter() - start
+        return self
+
+    def fit_prices(self, price, forward, strike, time_to_expiry, option_type, rf_rate=0.0,
+                   price_in_underlying=False, **kwargs):
+        """
+        Fit the slices to option prices, inverted with implied_volatility.implied_volatility first.
+        Remaining keyword arguments go to fit().
+        """
+        iv = implied_volatility(price, forward, strike, time_to_expiry, option_type, rf_rate, price_in_underlying)
+        return self.fit(strike, time_to_expiry, iv, forward, **kwargs)
+
+    def _fit_ssvi(self, k, w, weights, slices):
+        # ATM total variance of each expiry from its quotes, made non-decreasing to rule out calendar arbitrage
+        theta = np.empty(len(slices))
+        for i, rows in enumerate(slices):
+            order = np.argsort(k[rows])
+            theta[i] = np.interp(0.0, k[rows][order], w[rows][order])
+        theta = np.maximum.accumulate(np.maximum(theta, 1e-8))
+        rows = np.concatenate(slices)
+        slice_theta = np.repeat(theta, [r.size for r in slices])
+        k, w, weights = k[rows], w[rows], weights[rows]
+
+        def unpack(x):
+            rho, scale, gamma = x
+            # eta = scale * 2 / (1 + |rho|) keeps eta * (1 + |rho|) <= 2 within the bounds on scale
+            return rho, scale * 2.0 / (1.0 + abs(rho)), gamma
+
+        def residuals(x):
+            rho, eta, gamma = unpack(x)
+            phi = ssvi_phi(slice_theta, eta, gamma)
+            pk = phi * k
+            model = slice_theta / 2.0 * (1.0 + rho * pk + np.sqrt((pk + rho) ** 2 + 1.0 - rho * rho))
+            return (model - w) * weights
+
+        solution = least_squares(residuals, [-0.3, 0.5, 0.4], bounds=([-_MAX_RHO, 1e-6, 1e-3], [_MAX_RHO, 1.0, 0.5]),
+                                 method='trf')
+        rho, eta, gamma = unpack(solution.x)
+        self.ssvi_params = {'rho': rho, 'eta': eta, 'gamma': gamma, 'theta': theta}
+        return ssvi_to_svi(theta, rho, ssvi_phi(theta, eta, gamma))
+
+    def forward(self, time_to_expiry):
+        """
+        Forward price at each time to expiry, log-linear between the fitted expiries and flat outside them.
+        """
+        return np.exp(np.interp(time_to_expiry, self.expiries, np.log(self.forwards)))
+
+    def total_variance(self, k, time_to_expiry):
+        """
+        Total implied variance at log-moneyness k and time to expiry, broadcast together.
+        """
+        if not self.expiries.size:
+            raise ValueError("The surface has not been fitted")
+        k, t = np.broadcast_arrays(np.asarray(k, dtype=np.float64), np.asarray(time_to_expiry, dtype=np.float64))
+        shape = k.shape
+        k, t = k.ravel(), t.ravel()
+        expiries = self.expiries
+        last = expiries.size - 1
+        upper = np.searchsorted(expiries, t, side='right')
+        lo = np.maximum(upper - 1, 0)
+        hi = np.minimum(upper, last)
+
+        # Interpolation weight of the later slice, with both neighbours set to the nearest slice outside
+        # the fitted expiries, where the time scaling holds its implied volatility constant
+        gap = expiries[hi] - expiries[lo]
+        t_lo = expiries[lo]
+        inside = gap > 0.0
+        weight = np.divide(t - t_lo, gap, out=np.zeros_like(t), where=inside)
+        scale = np.where(inside, 1.0, t / t_lo)
+
+        a, b, rho, m, sigma2 = self._columns()
+        w = np.empty_like(t)
+        for index, factor in ((lo, 1.0 - weight), (hi, weight)):
+            y = k - m[index]
+            slice_w = b[index] * (rho[index] * y + np.sqrt(y * y + sigma2[index])) + a[index]
+            if index is lo:
+                np.multiply(slice_w, factor, out=w)
+            else:
+                w += slice_w * factor
+        w *= scale
+        return w.reshape(shape)
+
+    def _columns(self):
+        a, b, rho, m, sigma = (np.ascontiguousarray(column) for column in self.params.T)
+        return a, b, rho, m, sigma * sigma
+
+    def implied_vol(self, strike, time_to_expiry, forward=None):
+        """
+        Black implied volatility sigma(K, T)
+
+        Parameters:
+        -----------
+        strike : array-like
+            Strike prices
+        time_to_expiry : array-like
+            Time to expiry in years
+        forward : array-like, optional
+            Forward prices, defaults to the surface's interpolated forwards
+
+        Returns:
+        --------
+        numpy.ndarray
+            Implied volatilities, broadcast over the inputs
+        """
+        t = np.asarray(time_to_expiry, dtype=np.float64)
+        if forward is None:
+            forward = self.forward(t)
+        k = np.log(np.asarray(strike, dtype=np.float64) / forward)
+        # The volatility is constant in time before the first expiry, so evaluating there also covers
+        # expiries at T = 0 (options expiring within the hour) without a 0 / 0
+        t = np.maximum(t, self.expiries[0]) if self.expiries.size else t
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sqrt(np.maximum(self.total_variance(k, t), 0.0) / t)
+
+    __call__ = implied_vol
+
+    def sigma(self, strike, days_to_maturity, underlying=None, rf_rate=0.0, div=0.0):
+        """
+        Volatilities for the pricers' sigma argument, from the same columns they take, e.g.
+        pricer.price_batch(underlying, strike, surface.sigma(strike, days, underlying, r, q), r, days, q).
+        Forwards come from underlying * exp((rf_rate - div) * T) when underlying is given. T is the exact
+        days_to_maturity / 365, not truncated to whole days, so options within a day of expiry get the
+        front slice's volatility.
+        """
+        t = np.asarray(days_to_maturity, dtype=np.float64) / DAYS_PER_YEAR
+        forward = None if underlying is None else np.asarray(underlying) * np.exp((np.asarray(rf_rate) - div) * t)
+        return self.implied_vol(strike, t, forward)
+
+    def check_arbitrage(self, k=None, tol=1e-10):
+        """
+        Static arbitrage checks of the fitted slices on a log-moneyness grid
+
+        Butterfly: Gatheral's density g(k) >= 0 on each slice. Calendar: total variance does not decrease
+        from one expiry to the next at any k.
+
+        Parameters:
+        -----------
+        k : array-like, optional
+            Log-moneyness grid, defaults to 401 points on [-2, 2]
+        tol : float, default 1e-10
+            Tolerance below zero before a check fails
+
+        Returns:
+        --------
+        pandas.DataFrame
+            Per expiry: butterfly_min (min g), calendar_min (min increase of w from the previous expiry)
+            and the boolean butterfly_free and calendar_free columns
+        """
+        k = np.linspace(-2.0, 2.0, 401) if k is None else np.asarray(k, dtype=np.float64)
+        w, dw, d2w = svi_derivatives(k[None, :], *(p[:, None] for p in self.params.T))
+        g = butterfly_density(k[None, :], w, dw, d2w)
+        butterfly = np.where(w > 0.0, g, -np.inf).min(axis=1)
+        calendar = np.r_[np.inf, (w[1:] - w[:-1]).min(axis=1)] if w.shape[0] else np.empty(0)
+        return pd.DataFrame({
+            'time_to_expiry': self.expiries,
+            'butterfly_min': butterfly,
+            'butterfly_free': butterfly >= -tol,
+            'calendar_min': calendar,
+            'calendar_free': calendar >= -tol,
+        })
+
+    def frame(self):
+        """
+        Fitted raw SVI parameters per expiry.
+        """
+        df = pd.DataFrame(self.params, columns=list(SVI_PARAMS))
+        df.insert(0, 'forward', self.forwards)
+        df.insert(0, 'time_to_expiry', self.expiries)
+        return df
@@ -1,19 +1,130 @@
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import QuantLib as ql
+from .batch import extract_option_columns, price_columns, derive_seeds, chunk_bounds
+from .market_state import ql_option_type, set_evaluation_date
+from .models.binomial import crr_price
+from .models.black_scholes import DAYS_PER_YEAR, bsm_greeks, bsm_price, year_fraction
+from .models.finite_difference import fd_chain_price
+from .models.fourier import bates_cos_price, heston_cos_price
+from .models.monte_carlo import mc_european_price
+
+# Default rows per task for seeded batch pricers in price_parallel, fixed so prices do not depend on the worker count
+SEEDED_BATCH_CHUNK_SIZE = 1024
 
 class Pricer:
     def price():
         pass
 
+    def price_all(self, calculation_date, data, columns = None, use_tqdm = False):
+        """
+        Price a whole chain from a DataFrame or structured NumPy array.
+        Columns are validated and extracted once, then sent to price_batch when the pricer
+        has one, falling back to a per-row price() loop otherwise.
+
+        Args:
+            calculation_date (ql.Date): Evaluation date
+            data (pd.DataFrame or np.ndarray): Chain with the columns named in config.py
+            columns (dict): Optional overrides of pricer argument name -> column name
+            use_tqdm (bool): Show a progress bar for the per-row fallback
+
+        Returns:
+            tuple: (prices, stats) where stats holds rows, seconds, rows_per_second and mode
+        """
+        arrays = extract_option_columns(data, columns)
+        return price_columns(self, calculation_date, arrays, use_tqdm=use_tqdm)
+
+    def price_parallel(self, calculation_date, data, columns = None, workers = None, chunk_size = None):
+        """
+        Shard a chain across a process pool. Each worker prices its chunk through price_columns, so pricers
+        with price_batch keep their vectorized path and the others loop over price() row by row.
+        Meant for the CPU-bound numerical pricers (MC, binomial, finite differences).
+
+        Row-priced pricers with a seed get a per-option seed derived from (seed, row), so results are
+        reproducible whatever the worker count or chunk size. Batch pricers with a seed price every chunk
+        with their own seed, so the whole chain shares the same draws as in price_batch, and default to
+        SEEDED_BATCH_CHUNK_SIZE rows per chunk so their results do not depend on the worker count either.
+        Results come back in row order.
+
+        Args:
+            calculation_date (ql.Date): Evaluation date
+            data (pd.DataFrame or np.ndarray): Chain with the columns named in config.py
+            columns (dict): Optional overrides of pricer argument name -> column name
+            workers (int): Number of processes, defaults to os.cpu_count()
+            chunk_size (int): Rows per task, defaults to a few chunks per worker (SEEDED_BATCH_CHUNK_SIZE
+                for batch pricers with a seed)
+
+        Returns:
+            tuple: (prices, stats) where stats holds rows, seconds, rows_per_second, workers and chunks
+        """
+        arrays = extract_option_columns(data, columns)
+        rows = len(next(iter(arrays.values())))
+        workers = workers or os.cpu_count()
+        seeds = None
+        if hasattr(self, 'seed'):
+            if hasattr(self, 'price_batch'):
+                chunk_size = chunk_size or SEEDED_BATCH_CHUNK_SIZE
+            else:
+                seeds = derive_seeds(self.seed, rows)
+        bounds = chunk_bounds(rows, workers, chunk_size)
+        tasks = [
+            (self, calculation_date.serialNumber(),
+             {arg: values[start:stop] for arg, values in arrays.items()},
+             None if seeds is None else seeds[start:stop])
+            for start, stop in bounds
+        ]
+
+        start = time.perf_counter()
+        if workers == 1:
+            results = [_price_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_price_chunk, tasks))
+        prices = np.concatenate(results) if results else np.zeros(0)
+        seconds = time.perf_counter() - start
+
+        stats = {
+            'rows': rows,
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds > 0 else float('inf'),
+            'mode': 'parallel',
+            'workers': workers,
+            'chunks': len(bounds),
+        }
+        return prices, stats
+
+
+def _price_chunk(task):
+    # Runs in a worker process: QuantLib dates are not picklable, so the date travels as a serial number
+    pricer, serial_number, arrays, seeds = task
+    pricer = copy.copy(pricer)
+    calculation_date = ql.Date(serial_number)
+    if seeds is None or not len(seeds):
+        return price_columns(pricer, calculation_date, arrays)[0]
+    rows = len(seeds)
+    prices = np.zeros(rows)
+    for i in range(rows):
+        pricer.seed = int(seeds[i])
+        prices[i] = pricer.price(calculation_date, **{arg: values[i] for arg, values in arrays.items()})
+    return prices
+
 class AnalyticEuropeanPricer(Pricer):
     def __init__(self, option_type = ql.Option.Call):
         self.option_type = option_type
         print(f"Created {AnalyticEuropeanPricer.__name__} and option type {self.option_type}")
+
+    def engine(self, process):
+        return ql.AnalyticEuropeanEngine(process)
     
-    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div):
+    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
         maturity_date = ql.Date(calculation_date.serialNumber() + int(days_to_maturity))
         day_count = ql.Actual365Fixed()
         calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
-        ql.Settings.instance().evaluationDate = calculation_date
+        set_evaluation_date(calculation_date)
 
         bsm_process = ql.BlackScholesMertonProcess(
             s0 = ql.QuoteHandle(ql.SimpleQuote(underlying)),
@@ -21,14 +132,35 @@ class AnalyticEuropeanPricer(Pricer):
             riskFreeTS = ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, rf_rate, day_count)),
             volTS = ql.BlackVolTermStructureHandle(ql.BlackConstantVol(calculation_date, calendar, sigma, day_count)),
         )
-        payoff = ql.PlainVanillaPayoff(self.option_type, strike)
+        if option_type is None:
+            option_type = self.option_type
+        payoff = ql.PlainVanillaPayoff(ql_option_type(option_type), strike)
         europeanExcercise = ql.EuropeanExercise(maturity_date)
         europeanOption = ql.VanillaOption(payoff, europeanExcercise)
 
-        engine = ql.AnalyticEuropeanEngine(bsm_process)
+        engine = self.engine(bsm_process)
         europeanOption.setPricingEngine(engine)
 
         return europeanOption.NPV()
+
+    def price_batch(self, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
+        """
+        Vectorized closed-form prices for a whole chain in one pass.
+        Arguments are arrays named after the columns in config.py and are broadcast together.
+        option_type defaults to the pricer's option type and accepts ql.Option codes per row.
+        """
+        if option_type is None:
+            option_type = self.option_type
+        return bsm_price(underlying, strike, sigma, rf_rate, year_fraction(days_to_maturity), div, option_type)
+
+    def greeks_batch(self, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None, greeks = None):
+        """
+        Vectorized price and Greeks (delta, gamma, vega, theta, rho, vanna, volga, expected_move)
+        from shared d1/d2 in one pass. greeks selects a subset of outputs, see models.black_scholes.bsm_greeks.
+        """
+        if option_type is None:
+            option_type = self.option_type
+        return bsm_greeks(underlying, strike, sigma, rf_rate, year_fraction(days_to_maturity), div, option_type, greeks)
     
 class MCEuropeanPricer(Pricer):
     def __init__(self, steps, num_paths, option_type = ql.Option.Call, seed = 42):
@@ -37,12 +169,15 @@ class MCEuropeanPricer(Pricer):
         self.seed = seed
         self.option_type = option_type
         print(f"Created {MCEuropeanPricer.__name__} and option type {self.option_type}")
+
+    def engine(self, process):
+        return ql.MCEuropeanEngine(process, "pseudorandom", self.steps, requiredSamples=self.num_paths, seed=self.seed)
     
-    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div):
+    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
         maturity_date = ql.Date(calculation_date.serialNumber() + int(days_to_maturity))
         day_count = ql.Actual365Fixed()
         calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
-        ql.Settings.instance().evaluationDate = calculation_date
+        set_evaluation_date(calculation_date)
 
         bsm_process = ql.BlackScholesMertonProcess(
             s0 = ql.QuoteHandle(ql.SimpleQuote(underlying)),
@@ -50,26 +185,119 @@ class MCEuropeanPricer(Pricer):
             riskFreeTS = ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, rf_rate, day_count)),
             volTS = ql.BlackVolTermStructureHandle(ql.BlackConstantVol(calculation_date, calendar, sigma, day_count)),
         )
-        payoff = ql.PlainVanillaPayoff(self.option_type, strike)
+        if option_type is None:
+            option_type = self.option_type
+        payoff = ql.PlainVanillaPayoff(ql_option_type(option_type), strike)
         europeanExcercise = ql.EuropeanExercise(maturity_date)
         europeanOption = ql.VanillaOption(payoff, europeanExcercise)
 
-        engine = ql.MCEuropeanEngine(bsm_process, "pseudorandom", self.steps, requiredSamples=self.num_paths, seed=self.seed)
+        engine = self.engine(bsm_process)
         europeanOption.setPricingEngine(engine)
 
         return europeanOption.NPV()
     
+class VectorizedMCEuropeanPricer(Pricer):
+    """
+    In-house Monte Carlo pricer that samples exact terminal prices for a whole chain in one pass,
+    with antithetic variates, a control variate and chunked path generation.
+    See models.monte_carlo.mc_european_price.
+    """
+    def __init__(self, num_paths, option_type = ql.Option.Call, seed = 42, antithetic = True, control_variate = True, chunk_size = None):
+        self.num_paths = num_paths
+        self.option_type = option_type
+        self.seed = seed
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.chunk_size = chunk_size
+        print(f"Created {VectorizedMCEuropeanPricer.__name__} and option type {self.option_type}")
+
+    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
+        return float(self.price_batch(underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type))
+
+    def price_batch(self, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None, return_std_error = False):
+        """
+        Monte Carlo prices for arrays named after the columns in config.py.
+        With return_std_error=True returns (prices, standard errors).
+        """
+        if option_type is None:
+            option_type = self.option_type
+        prices, std_errors = mc_european_price(
+            underlying, strike, sigma, rf_rate, year_fraction(days_to_maturity), div, option_type,
+            num_paths=self.num_paths, antithetic=self.antithetic, control_variate=self.control_variate,
+            chunk_size=self.chunk_size, seed=self.seed)
+        if return_std_error:
+            return prices, std_errors
+        return prices
+
 class BinomialEuropeanPricer(Pricer):
-    def __init__(self, steps, option_type = ql.Option.Call):
+    def __init__(self, steps, option_type = ql.Option.Call, extrapolation = None):
         self.steps = steps
         self.option_type = option_type
+        self.extrapolation = extrapolation
         print(f"Created {BinomialEuropeanPricer.__name__} and option type {self.option_type}")
+
+    def engine(self, process):
+        return ql.BinomialVanillaEngine(process, "crr", self.steps)
+
+    def price_batch(self, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
+        """
+        CRR prices for a whole chain from one batched lattice, see models.binomial.crr_price.
+        extrapolation ('odd_even' or 'richardson') only applies to this batch path.
+        """
+        if option_type is None:
+            option_type = self.option_type
+        return crr_price(underlying, strike, sigma, rf_rate, year_fraction(days_to_maturity), div, option_type,
+                         steps=self.steps, extrapolation=self.extrapolation)
+    
+    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
+        maturity_date = ql.Date(calculation_date.serialNumber() + int(days_to_maturity))
+        day_count = ql.Actual365Fixed()
+        calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
+        set_evaluation_date(calculation_date)
+
+        bsm_process = ql.BlackScholesMertonProcess(
+            s0 = ql.QuoteHandle(ql.SimpleQuote(underlying)),
+            dividendTS = ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, div, day_count)),
+            riskFreeTS = ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, rf_rate, day_count)),
+            volTS = ql.BlackVolTermStructureHandle(ql.BlackConstantVol(calculation_date, calendar, sigma, day_count)),
+        )
+        if option_type is None:
+            option_type = self.option_type
+        payoff = ql.PlainVanillaPayoff(ql_option_type(option_type), strike)
+        europeanExcercise = ql.EuropeanExercise(maturity_date)
+        europeanOption = ql.VanillaOption(payoff, europeanExcercise)
+
+        engine = self.engine(bsm_process)
+        europeanOption.setPricingEngine(engine)
+
+        return europeanOption.NPV()
+
+class FdBlackScholesVanillaPricer(Pricer):
+    def __init__(self, time_grid, stock_grid, option_type = ql.Option.Call):
+        self.time_grid = time_grid
+        self.stock_grid = stock_grid
+        self.option_type = option_type
+        print(f"Created {FdBlackScholesVanillaPricer.__name__} and option type {self.option_type}")
+
+    def engine(self, process):
+        return ql.FdBlackScholesVanillaEngine(process, self.time_grid, self.stock_grid)
+
+    def price_batch(self, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None, return_greeks = False):
+        """
+        Chain-level finite differences: one PDE solve per expiry prices every strike,
+        see models.finite_difference.fd_chain_price.
+        With return_greeks=True returns a dict with price, delta, gamma and theta from the same grid.
+        """
+        if option_type is None:
+            option_type = self.option_type
+        return fd_chain_price(underlying, strike, sigma, rf_rate, year_fraction(days_to_maturity), div, option_type,
+                              time_grid=self.time_grid, stock_grid=self.stock_grid, greeks=return_greeks)
     
-    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div):
+    def price(self, calculation_date, underlying, strike, sigma, rf_rate, days_to_maturity, div, option_type = None):
         maturity_date = ql.Date(calculation_date.serialNumber() + int(days_to_maturity))
         day_count = ql.Actual365Fixed()
         calendar = ql.UnitedStates(ql.UnitedStates.NYSE)
-        ql.Settings.instance().evaluationDate = calculation_date
+        set_evaluation_date(calculation_date)
 
         bsm_process = ql.BlackScholesMertonProcess(
             s0 = ql.QuoteHandle(ql.SimpleQuote(underlying)),
@@ -77,11 +305,124 @@ class BinomialEuropeanPricer(Pricer):
             riskFreeTS = ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, rf_rate, day_count)),
             volTS = ql.BlackVolTermStructureHandle(ql.BlackConstantVol(calculation_date, calendar, sigma, day_count)),
         )
-        payoff = ql.PlainVanillaPayoff(self.option_type, strike)
+        if option_type is None:
+            option_type = self.option_type
+        payoff = ql.PlainVanillaPayoff(ql_option_type(option_type), strike)
         europeanExcercise = ql.EuropeanExercise(maturity_date)
         europeanOption = ql.VanillaOption(payoff, europeanExcercise)
 
-        engine = ql.BinomialVanillaEngine(bsm_process, "crr", self.steps)
+        engine = self.engine(bsm_process)
         europeanOption.setPricingEngine(engine)
 
-        return europeanOption.NPV()
\ No newline at end of file
+        return europeanOption.NPV()
+
+class HestonPricer(Pricer):
+    """
+    Heston stochastic volatility pricer.
+    price() goes through QuantLib's AnalyticHestonEngine, price_batch() prices whole chains with the
+    COS method from one characteristic function evaluation per expiry (see models.fourier).
+    Parameters follow StochasticProcess.heston_process; sigma is the vol of vol.
+    exact_maturity prices fractional days_to_maturity as is instead of truncating them to whole days
+    like QuantLib's dates, as Calibrator fits do; price() then goes through the COS method as well.
+    """
+    def __init__(self, v0, kappa, theta, sigma, rho, option_type = ql.Option.Call, n_terms = 256, truncation = 10.0,
+                 exact_maturity = False):
+        self.v0 = v0
+        self.kappa = kappa
+        self.theta = theta
+        self.sigma = sigma
+        self.rho = rho
+        self.option_type = option_type
+        self.n_terms = n_terms
+        self.truncation = truncation
+        self.exact_maturity = exact_maturity
+        print(f"Created {HestonPricer.__name__} and option type {self.option_type}")
+
+    def engine(self, process):
+        return ql.AnalyticHestonEngine(ql.HestonModel(process))
+
+    def process(self, calculation_date, underlying, rf_rate, div):
+        day_count = ql.Actual365Fixed()
+        return ql.HestonProcess(
+            ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, rf_rate, day_count)),
+            ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, div, day_count)),
+            ql.QuoteHandle(ql.SimpleQuote(underlying)),
+            self.v0, self.kappa, self.theta, self.sigma, self.rho)
+
+    def price(self, calculation_date, underlying, strike, rf_rate, days_to_maturity, div, option_type = None, sigma = None):
+        """
+        sigma is accepted and ignored so chains carrying a Black-Scholes sigma column can be priced as-is.
+        """
+        if self.exact_maturity:
+            return float(self.price_batch(underlying, strike, rf_rate, days_to_maturity, div, option_type))
+        maturity_date = ql.Date(calculation_date.serialNumber() + int(days_to_maturity))
+        set_evaluation_date(calculation_date)
+
+        if option_type is None:
+            option_type = self.option_type
+        payoff = ql.PlainVanillaPayoff(ql_option_type(option_type), strike)
+        europeanExcercise = ql.EuropeanExercise(maturity_date)
+        europeanOption = ql.VanillaOption(payoff, europeanExcercise)
+
+        engine = self.engine(self.process(calculation_date, underlying, rf_rate, div))
+        europeanOption.setPricingEngine(engine)
+
+        return europeanOption.NPV()
+
+    def time_to_expiry(self, days_to_maturity):
+        if self.exact_maturity:
+            return np.asarray(days_to_maturity, dtype=np.float64) / DAYS_PER_YEAR
+        return year_fraction(days_to_maturity)
+
+    def price_batch(self, underlying, strike, rf_rate, days_to_maturity, div, option_type = None, sigma = None):
+        if option_type is None:
+            option_type = self.option_type
+        return heston_cos_price(underlying, strike, rf_rate, self.time_to_expiry(days_to_maturity), div, option_type,
+                                self.v0, self.kappa, self.theta, self.sigma, self.rho,
+                                n_terms=self.n_terms, truncation=self.truncation)
+
+
+class BatesPricer(HestonPricer):
+    """
+    Bates jump-diffusion pricer: Heston plus lognormal jumps, which fits the steep short-dated wings of crypto smiles.
+    price() goes through QuantLib's BatesEngine and serves as the cross-check for price_batch(), which prices
+    whole chains with the COS method on a range fitted to each expiry (shared_grid: one range for the chain,
+    faster but less accurate on short expiries, see models.fourier.cos_chain_plan).
+    Parameters follow StochasticProcess.bates_process.
+    """
+    def __init__(self, v0, kappa, theta, sigma, rho, lambda_param, nu, delta, option_type = ql.Option.Call,
+                 n_terms = 512, truncation = 12.0, shared_grid = False, exact_maturity = False):
+        self.v0 = v0
+        self.kappa = kappa
+        self.theta = theta
+        self.sigma = sigma
+        self.rho = rho
+        self.lambda_param = lambda_param
+        self.nu = nu
+        self.delta = delta
+        self.option_type = option_type
+        self.n_terms = n_terms
+        self.truncation = truncation
+        self.shared_grid = shared_grid
+        self.exact_maturity = exact_maturity
+        print(f"Created {BatesPricer.__name__} and option type {self.option_type}")
+
+    def engine(self, process):
+        return ql.BatesEngine(ql.BatesModel(process))
+
+    def process(self, calculation_date, underlying, rf_rate, div):
+        day_count = ql.Actual365Fixed()
+        return ql.BatesProcess(
+            ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, rf_rate, day_count)),
+            ql.YieldTermStructureHandle(ql.FlatForward(calculation_date, div, day_count)),
+            ql.QuoteHandle(ql.SimpleQuote(underlying)),
+            self.v0, self.kappa, self.theta, self.sigma, self.rho,
+            self.lambda_param, self.nu, self.delta)
+
+    def price_batch(self, underlying, strike, rf_rate, days_to_maturity, div, option_type = None, sigma = None):
+        if option_type is None:
+            option_type = self.option_type
+        return bates_cos_price(underlying, strike, rf_rate, self.time_to_expiry(days_to_maturity), div, option_type,
+                               self.v0, self.kappa, self.theta, self.sigma, self.rho,
+                               self.lambda_param, self.nu, self.delta,
+                               n_terms=self.n_terms, truncation=self.truncation, shared_grid=self.shared_grid)